@@ -1,12 +1,11 @@
 import turtle
-import time
-import heapq
+from maze_search import ALGORITHMS, EventRecorder, parse_grid, solve
 
-# Set up screen
-wn = turtle.Screen()
-wn.bgcolor("black")
-wn.title("A Maze Solving Program")
-wn.setup(1300, 700)
+# Turtle front end for maze_search. The search itself runs headless; the
+# events it records are drawn here once it has finished.
+
+CELL_SIZE = 24
+ORIGIN_X, ORIGIN_Y = -588, 288
 
 # Define *
 class Maze(turtle.Turtle):
@@ -74,103 +73,68 @@ grid1 = [
     "++++++++++++++++++++++++++++++++++++++++++++++",
 ]
 
-# Heuristic function (Manhattan distance)
-def heuristic(cell, goal):
-    x1, y1 = cell
-    x2, y2 = goal
-    return abs(x1 - x2) + abs(y1 - y2)
-
-# Draw shortest path
-def backRoute(x, y):
-    yellow.goto(x, y)
-    yellow.stamp()
-    while (x, y) != (start_x, start_y):
-        x, y = solution[x, y]
-        yellow.goto(x, y)
-        yellow.stamp()
-
-# Greedy or A* search
-def solve(algorithm="greedy"):
-    frontier = []
-    heapq.heappush(frontier, (heuristic((start_x, start_y), (end_x, end_y)), 0, (start_x, start_y)))
-    solution[start_x, start_y] = None
-    costs = { (start_x, start_y): 0 }
-
-    while frontier:
-        _, g, current = heapq.heappop(frontier)
-        x, y = current
-
-        if (x, y) == (end_x, end_y):
-            backRoute(x, y)
-            return
-
-        for dx, dy in [(-24, 0), (0, -24), (24, 0), (0, 24)]:
-            neighbor = (x + dx, y + dy)
-            if neighbor in path and neighbor not in visited:
-                visited.append(neighbor)
-                solution[neighbor] = (x, y)
-                blue.goto(neighbor)
-                blue.stamp()
-
-                new_cost = costs[(x, y)] + 1
-                costs[neighbor] = new_cost
-
-                if algorithm == "greedy":
-                    priority = heuristic(neighbor, (end_x, end_y))
-                else:
-                    priority = new_cost + heuristic(neighbor, (end_x, end_y))
-
-                heapq.heappush(frontier, (priority, new_cost, neighbor))
-                green.goto(x, y)
-                green.stamp()
+# Grid cell to screen pixels
+def to_screen(cell):
+    row, col = cell
+    return ORIGIN_X + (col * CELL_SIZE), ORIGIN_Y - (row * CELL_SIZE)
+
+# Draws search events: blue for discovered cells, green for expanded
+# cells and yellow for the final path
+class TurtleObserver:
+    def __init__(self, maze_grid):
+        self.maze_grid = maze_grid
+        self.pens = {"push": Blue(), "expand": Green(), "path": Yellow()}
+
+    def __call__(self, event, index):
+        pen = self.pens[event]
+        pen.goto(to_screen(self.maze_grid.cell(index)))
+        pen.stamp()
 
 # Setup maze
 def setup_maze(grid):
-    global start_x, start_y, end_x, end_y
+    maze, red, yellow = Maze(), Red(), Yellow()
     for y in range(len(grid)):
         for x in range(len(grid[y])):
             char = grid[y][x]
-            screen_x = -588 + (x * 24)
-            screen_y = 288 - (y * 24)
+            screen_x, screen_y = to_screen((y, x))
 
             if char == "+":
                 maze.goto(screen_x, screen_y)
                 maze.stamp()
-                walls.append((screen_x, screen_y))
-            elif char == " ":
-                path.append((screen_x, screen_y))
             elif char == "e":
-                end_x, end_y = screen_x, screen_y
                 yellow.goto(screen_x, screen_y)
                 yellow.stamp()
-                path.append((screen_x, screen_y))
             elif char == "s":
-                start_x, start_y = screen_x, screen_y
                 red.goto(screen_x, screen_y)
                 red.stamp()
-                path.append((screen_x, screen_y))
-
-# Initialize
-maze = Maze()
-red = Red()
-blue = Blue()
-green = Green()
-yellow = Yellow()
-walls, path, visited = [], [], []
-solution = {}
-
-# Get user input
-choice = wn.textinput("Choose Algorithm", "Enter 'greedy' or 'astar':").strip().lower()
-if choice not in ("greedy", "astar"):
-    print("Invalid input! Defaulting to A* Search.")
-    choice = "astar"
-
-# Run
-setup_maze(grid1)
-solve(algorithm=choice)
-
-# Save image
-wn.getcanvas().postscript(file="maze_solution.eps")
-
-# Finish
-wn.exitonclick()
+
+    return parse_grid(grid)
+
+def main():
+    # Set up screen
+    wn = turtle.Screen()
+    wn.bgcolor("black")
+    wn.title("A Maze Solving Program")
+    wn.setup(1300, 700)
+
+    # Get user input
+    choice = wn.textinput("Choose Algorithm", "Enter 'greedy', 'astar' or 'jps':").strip().lower()
+    if choice not in ALGORITHMS:
+        print("Invalid input! Defaulting to A* Search.")
+        choice = "astar"
+
+    # Run
+    maze_grid = setup_maze(grid1)
+    recorder = EventRecorder()
+    result = solve(maze_grid, algorithm=choice, observer=recorder)
+    recorder.replay(TurtleObserver(maze_grid))
+    print(f"Path cost: {result.cost}, expanded: {result.expanded}, time: {result.elapsed * 1000:.2f} ms")
+
+    # Save image
+    wn.getcanvas().postscript(file="maze_solution.eps")
+
+    # Finish
+    wn.exitonclick()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from maze_search import ALGORITHMS, parse_grid, solve
+
+# Batch front end for maze_search: solve many mazes across all cores and
+# write one JSON result per line.
+#
+#   python maze_batch.py mazes/ -o results.jsonl
+#   python maze_batch.py mazes.jsonl --algorithm jps --workers 16
+#   cat mazes.jsonl | python maze_batch.py -
+#
+# Input is either a directory of maze text files in the usual "+"/" "/"s"/"e"
+# format (one maze per file) or a JSONL stream of {"id": ..., "maze": ...}
+# objects, where "maze" is a list of rows or one newline-separated string.
+
+# Read one maze text file into rows, ignoring trailing blank lines
+def read_maze_file(path):
+    with open(path) as f:
+        rows = f.read().splitlines()
+    while rows and not rows[-1].strip():
+        rows.pop()
+    return rows
+
+# Stands in for the rows of a maze file or JSONL line that could not be read,
+# so the problem is reported in that maze's result instead of stopping the batch
+class InvalidRecord(str):
+    pass
+
+# Yield (id, rows) pairs from a directory, a JSONL file or "-" for stdin.
+# JSONL records without an "id" are identified by their 1-based line number.
+def iter_mazes(source):
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path):
+                try:
+                    rows = read_maze_file(path)
+                except (OSError, UnicodeDecodeError) as error:
+                    rows = InvalidRecord(f"{name}: {type(error).__name__}: {error}")
+                yield name, rows
+        return
+
+    stream = sys.stdin if source == "-" else open(source)
+    try:
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                maze = record["maze"]
+                maze_id = record.get("id", number)
+            except (ValueError, KeyError, TypeError, AttributeError) as error:
+                yield number, InvalidRecord(f"line {number}: {type(error).__name__}: {error}")
+                continue
+            if isinstance(maze, str):
+                maze = maze.splitlines()
+            yield maze_id, maze
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+# Runs in a worker process; records and mazes that cannot be read are
+# reported as error results, not raised
+def solve_task(task):
+    maze_id, rows, algorithm, diagonal = task
+    if isinstance(rows, InvalidRecord):
+        return {"id": maze_id, "error": str(rows)}
+    try:
+        result = solve(parse_grid(rows), algorithm=algorithm, diagonal=diagonal)
+    except (ValueError, TypeError, AttributeError, IndexError) as error:
+        return {"id": maze_id, "error": f"{type(error).__name__}: {error}"}
+    return {"id": maze_id, **result.as_dict()}
+
+# Yield results in input order. Tasks go to the pool in windows of
+# workers * chunksize * 4 so an endless stream never sits in memory at once,
+# and each worker receives chunksize mazes per round trip to keep IPC cheap.
+def solve_batch(mazes, algorithm="astar", diagonal=False, workers=None, chunksize=16):
+    tasks = ((maze_id, rows, algorithm, diagonal) for maze_id, rows in mazes)
+    if workers == 1:
+        yield from map(solve_task, tasks)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    window = workers * chunksize * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(itertools.islice(tasks, window))
+            if not batch:
+                break
+            yield from executor.map(solve_task, batch, chunksize=chunksize)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve many mazes in parallel and write JSONL results.")
+    parser.add_argument("source", help="directory of maze files, a JSONL file, or - for JSONL on stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="astar")
+    parser.add_argument("--diagonal", action="store_true", help="allow 8-connected movement")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=16, help="mazes sent to a worker at a time")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        results = solve_batch(iter_mazes(args.source), args.algorithm, args.diagonal, args.workers, args.chunksize)
+        for result in results:
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
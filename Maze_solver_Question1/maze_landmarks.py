@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+
+from maze_search import DistanceField, heuristic, octile
+
+# ALT (A*, Landmarks, Triangle inequality) heuristics for answering many
+# queries on the same static maze. A few landmark cells are chosen once and
+# their distances to every cell are stored; for any landmark L
+#     d(v, t) >= d(L, t) - d(L, v)   and   d(v, t) >= d(v, L) - d(t, L)
+# so the largest of these differences is an admissible, consistent estimate
+# that is usually much tighter than Manhattan distance.
+
+# Stand-in for "no path" so table arithmetic never produces NaN
+UNREACHABLE = 1e30
+# Endpoint rows kept by Landmarks before the cache starts over
+ENDPOINT_CACHE = 8
+
+# Distance tables. Both are (cells, landmarks) so one cell's row is
+# contiguous; to_table is the same array as from_table on unweighted grids,
+# where distances are symmetric.
+class Landmarks:
+    def __init__(self, width, height, landmarks, from_table, to_table, diagonal=False):
+        self.width = width
+        self.height = height
+        self.landmarks = landmarks
+        self.from_table = from_table
+        self.to_table = to_table
+        self.diagonal = diagonal
+        self.fallback = octile if diagonal else heuristic
+        self._endpoints = {}
+
+    # One cell's rows of both tables as Python lists; for a handful of
+    # landmarks, comparing lists is several times cheaper than a NumPy
+    # expression per call
+    def _rows(self, index):
+        from_row = self.from_table[index].tolist()
+        to_row = from_row if self.to_table is self.from_table else self.to_table[index].tolist()
+        return from_row, to_row
+
+    # Rows of a cell that is queried over and over (a goal, or the start of a
+    # bidirectional search), cached for a few such cells at a time
+    def _endpoint(self, index):
+        rows = self._endpoints.get(index)
+        if rows is None:
+            if len(self._endpoints) >= ENDPOINT_CACHE:
+                self._endpoints.clear()
+            rows = self._endpoints[index] = self._rows(index)
+        return rows
+
+    # Landmark lower bound on the cost from source to target, given their rows
+    def _bound(self, source, target):
+        bound = 0.0
+        if self.to_table is self.from_table:
+            for to_target, to_source in zip(target[0], source[0]):
+                difference = abs(to_target - to_source)
+                if difference > bound:
+                    bound = difference
+        else:
+            for to_target, to_source in zip(target[0], source[0]):
+                if to_target - to_source > bound:
+                    bound = to_target - to_source
+            for from_target, from_source in zip(target[1], source[1]):
+                if from_source - from_target > bound:
+                    bound = from_source - from_target
+        return bound
+
+    # Drop-in replacement for heuristic(): solve(..., estimate=landmarks).
+    # Lower bound on the cost of getting from index to goal.
+    def __call__(self, grid, index, goal):
+        bound = self._bound(self._rows(index), self._endpoint(goal))
+        fallback = self.fallback(grid, index, goal)
+        return bound if bound > fallback else fallback
+
+    # Balanced potential (h(v, goal) - h(start, v)) / 2 for solve_bidirectional(),
+    # with both endpoints' rows looked up once and each cell's rows once per call
+    def potential(self, grid, start, goal):
+        start_rows, goal_rows = self._endpoint(start), self._endpoint(goal)
+        fallback = self.fallback
+
+        def potential(index):
+            rows = self._rows(index)
+            forward = max(self._bound(rows, goal_rows), fallback(grid, index, goal))
+            backward = max(self._bound(start_rows, rows), fallback(grid, start, index))
+            return (forward - backward) / 2
+        return potential
+
+    def matches(self, grid):
+        return (grid.width, grid.height) == (self.width, self.height)
+
+    # One .npy file per table so load_landmarks() can memory-map them
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        meta = np.array([self.width, self.height, int(self.diagonal)], dtype=np.int64)
+        np.save(os.path.join(directory, "meta.npy"), meta)
+        np.save(os.path.join(directory, "landmarks.npy"), self.landmarks)
+        np.save(os.path.join(directory, "from.npy"), self.from_table)
+        if self.to_table is not self.from_table:
+            np.save(os.path.join(directory, "to.npy"), self.to_table)
+
+def load_landmarks(directory, mmap=True):
+    mode = "r" if mmap else None
+    width, height, diagonal = np.load(os.path.join(directory, "meta.npy")).tolist()
+    landmarks = np.load(os.path.join(directory, "landmarks.npy"))
+    from_table = np.load(os.path.join(directory, "from.npy"), mmap_mode=mode)
+    to_path = os.path.join(directory, "to.npy")
+    to_table = np.load(to_path, mmap_mode=mode) if os.path.exists(to_path) else from_table
+    return Landmarks(width, height, landmarks, from_table, to_table, bool(diagonal))
+
+def _distances(field):
+    distances = np.frombuffer(field.distances, dtype=np.float64).copy()
+    distances[np.isinf(distances)] = UNREACHABLE
+    return distances
+
+# Stack per-landmark columns into a (cells, landmarks) table. Integer
+# distances below 2**24 are exact in float32, which halves the size;
+# anything else (diagonal sqrt(2) steps, huge mazes) stays float64.
+def _table(columns, diagonal):
+    table = np.stack(columns, axis=1)
+    finite = table[table < UNREACHABLE]
+    if not diagonal and (finite.size == 0 or finite.max() < 2 ** 24):
+        return table.astype(np.float32)
+    return table
+
+# Pick landmarks by farthest-point selection: the first is the cell farthest
+# from the start, every next one the cell farthest from all landmarks so far.
+# Landmarks on the edge of the maze give the tightest bounds.
+def build_landmarks(grid, count=8, diagonal=False):
+    weighted = grid.weights is not None
+    nearest = _distances(DistanceField(grid, grid.start, diagonal))
+    nearest[nearest >= UNREACHABLE] = -1
+
+    landmarks, forward, backward = [], [], []
+    for _ in range(count):
+        landmark = int(np.argmax(nearest))
+        if landmarks and nearest[landmark] <= 0:
+            break
+        distances = _distances(DistanceField(grid, landmark, diagonal))
+        landmarks.append(landmark)
+        forward.append(distances)
+        if weighted:
+            backward.append(_distances(DistanceField(grid, landmark, diagonal, reverse=True)))
+
+        reachable = np.where(distances >= UNREACHABLE, -1, distances)
+        nearest = reachable if len(landmarks) == 1 else np.minimum(nearest, reachable)
+
+    from_table = _table(forward, diagonal)
+    to_table = _table(backward, diagonal) if weighted else from_table
+    return Landmarks(grid.width, grid.height, np.array(landmarks, dtype=np.int64), from_table, to_table, diagonal)
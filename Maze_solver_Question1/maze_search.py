@@ -0,0 +1,575 @@
+import heapq
+import math
+import time
+from array import array
+
+# Pure search engine for the maze solver. Nothing in here touches turtle,
+# so it can run on machines without a display. The maze is stored as a
+# flat bytearray of walls and every cell is addressed by its index
+# row * width + col; converting to screen pixels is the front end's job.
+
+WALL = "+"
+OPEN = " "
+START = "s"
+END = "e"
+# Digits are open cells that cost that much to enter (" " costs 1)
+WEIGHTS = "123456789"
+
+ALGORITHMS = ("greedy", "astar", "jps")
+BIDIRECTIONAL_ALGORITHMS = ("astar", "bfs")
+
+# (row, col) deltas of the diagonal moves used with diagonal=True
+DIAGONALS = [(1, -1), (1, 1), (-1, 1), (-1, -1)]
+SQRT2 = math.sqrt(2)
+
+# Byte translation table: 0 for walkable characters, 1 for everything else
+_CELL_TABLE = bytearray(b"\x01" * 256)
+for _char in OPEN + START + END + WEIGHTS:
+    _CELL_TABLE[ord(_char)] = 0
+_CELL_TABLE = bytes(_CELL_TABLE)
+
+# Byte translation table: cost of entering each walkable character
+_COST_TABLE = bytearray(b"\x01" * 256)
+for _char in WEIGHTS:
+    _COST_TABLE[ord(_char)] = int(_char)
+_COST_TABLE = bytes(_COST_TABLE)
+
+# Parsed maze
+class Grid:
+    def __init__(self, width, height, walls, starts, ends, weights=None):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.walls = walls
+        # Every "s" and "e" cell; start and end are the first of each
+        self.starts = starts
+        self.ends = ends
+        self.start = starts[0]
+        self.end = ends[0]
+        # Per-cell entry costs, or None when every move costs 1
+        self.weights = weights
+
+    def index(self, row, col):
+        return row * self.width + col
+
+    def cell(self, index):
+        return divmod(index, self.width)
+
+    def is_open(self, index):
+        return not self.walls[index]
+
+    # Bounds-checked walkability for (row, col) coordinates
+    def open_at(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row * self.width + col]
+
+    def step_cost(self, index):
+        return self.weights[index] if self.weights is not None else 1
+
+    # Open neighbours in the same order as the original turtle version:
+    # left, down, right, up
+    def neighbors(self, index):
+        width, walls = self.width, self.walls
+        col = index % width
+        if col > 0 and not walls[index - 1]:
+            yield index - 1
+        down = index + width
+        if down < self.size and not walls[down]:
+            yield down
+        if col < width - 1 and not walls[index + 1]:
+            yield index + 1
+        up = index - width
+        if up >= 0 and not walls[up]:
+            yield up
+
+    # (neighbour, distance) pairs. Diagonal steps are only allowed when both
+    # cells they squeeze between are open, so paths never cut corners.
+    def moves(self, index, diagonal=False):
+        for neighbor in self.neighbors(index):
+            yield neighbor, 1
+        if diagonal:
+            row, col = divmod(index, self.width)
+            for dr, dc in DIAGONALS:
+                if self.open_at(row + dr, col + dc) and self.open_at(row + dr, col) and self.open_at(row, col + dc):
+                    yield (row + dr) * self.width + col + dc, SQRT2
+
+# Search output
+class SearchResult:
+    def __init__(self, algorithm, path, cost, stats, elapsed):
+        self.algorithm = algorithm
+        self.path = path
+        self.cost = cost
+        self.expanded = stats["expanded"]
+        self.pushes = stats["pushes"]
+        self.pops = stats["pops"]
+        self.stale_pops = stats["stale_pops"]
+        self.elapsed = elapsed
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+    def as_dict(self):
+        return {
+            "algorithm": self.algorithm,
+            "found": self.found,
+            "path": [list(cell) for cell in self.path],
+            "cost": self.cost,
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "time": self.elapsed,
+        }
+
+# Observer that keeps every event so it can be drawn after the search
+class EventRecorder:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, index):
+        self.events.append((event, index))
+
+    def replay(self, observer):
+        for event, index in self.events:
+            observer(event, index)
+
+# Build a Grid from rows of "+", " ", "s", "e" and optional digit weights.
+# Short rows are padded with walls; any other character is a wall.
+def parse_grid(grid):
+    height = len(grid)
+    width = max((len(line) for line in grid), default=0)
+    walls = bytearray()
+    weights = bytearray()
+    weighted = False
+    starts, ends = [], []
+    for row, line in enumerate(grid):
+        for char, found in ((START, starts), (END, ends)):
+            col = line.find(char)
+            while col != -1:
+                found.append(row * width + col)
+                col = line.find(char, col + 1)
+        encoded = line.ljust(width, WALL).encode("ascii", "replace")
+        walls += encoded.translate(_CELL_TABLE)
+        weights += encoded.translate(_COST_TABLE)
+        weighted = weighted or any(char in line for char in WEIGHTS)
+
+    if not starts or not ends:
+        raise ValueError("Maze needs at least one 's' and one 'e' cell")
+
+    return Grid(width, height, walls, starts, ends, weights if weighted else None)
+
+# Heuristic function (Manhattan distance between two cell indices)
+def heuristic(grid, index, goal):
+    r1, c1 = divmod(index, grid.width)
+    r2, c2 = divmod(goal, grid.width)
+    return abs(r1 - r2) + abs(c1 - c2)
+
+# Octile distance, the admissible heuristic once diagonal moves cost sqrt(2)
+def octile(grid, index, goal):
+    r1, c1 = divmod(index, grid.width)
+    r2, c2 = divmod(goal, grid.width)
+    dr, dc = abs(r1 - r2), abs(c1 - c2)
+    return max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+
+# Walk the parent links back from the goal
+def reconstruct_path(parents, index):
+    path = []
+    while index != -1:
+        path.append(index)
+        index = parents[index]
+    path.reverse()
+    return path
+
+# Fill in the cells between consecutive jump points, which always lie on a
+# straight or diagonal line
+def interpolate_path(grid, points):
+    path = points[:1]
+    for point in points[1:]:
+        row, col = grid.cell(path[-1])
+        end_row, end_col = grid.cell(point)
+        dr = (end_row > row) - (end_row < row)
+        dc = (end_col > col) - (end_col < col)
+        while (row, col) != (end_row, end_col):
+            row, col = row + dr, col + dc
+            path.append(grid.index(row, col))
+    return path
+
+# Jump Point Search successors (Harabor & Grastien) for uniform-cost grids.
+# Instead of every neighbour, a cell's successors are the next "jump points"
+# along each direction that survives symmetry pruning: cells with a forced
+# neighbour, or the goal. Straight runs are scanned in a loop, not pushed on
+# the heap. With diagonal=True corners are never cut, matching Grid.moves().
+class JumpPoints:
+    def __init__(self, grid, goal, diagonal=False):
+        self.grid = grid
+        self.goal = grid.cell(goal)
+        self.diagonal = diagonal
+        self.distance = octile if diagonal else heuristic
+
+    def successors(self, index, parent):
+        grid = self.grid
+        row, col = grid.cell(index)
+        jump = self.jump8 if self.diagonal else self.jump4
+        for n_row, n_col in self.pruned_neighbors(row, col, parent):
+            point = jump(n_row, n_col, n_row - row, n_col - col)
+            if point is not None:
+                target = grid.index(*point)
+                yield target, self.distance(grid, index, target)
+
+    # Neighbours worth exploring given the direction we arrived from
+    def pruned_neighbors(self, row, col, parent):
+        open_at = self.grid.open_at
+        if parent == -1:
+            return [self.grid.cell(n) for n, _ in self.grid.moves(self.grid.index(row, col), self.diagonal)]
+
+        p_row, p_col = self.grid.cell(parent)
+        dr = (row > p_row) - (row < p_row)
+        dc = (col > p_col) - (col < p_col)
+        if not self.diagonal:
+            if dc:
+                candidates = [(row - 1, col), (row + 1, col), (row, col + dc)]
+            else:
+                candidates = [(row, col - 1), (row, col + 1), (row + dr, col)]
+            return [cell for cell in candidates if open_at(*cell)]
+
+        found = []
+        if dr and dc:
+            vertical = open_at(row + dr, col)
+            horizontal = open_at(row, col + dc)
+            if vertical:
+                found.append((row + dr, col))
+            if horizontal:
+                found.append((row, col + dc))
+            if vertical and horizontal:
+                found.append((row + dr, col + dc))
+        elif dc:
+            ahead, below, above = open_at(row, col + dc), open_at(row + 1, col), open_at(row - 1, col)
+            if ahead:
+                found.append((row, col + dc))
+                if below:
+                    found.append((row + 1, col + dc))
+                if above:
+                    found.append((row - 1, col + dc))
+            if below:
+                found.append((row + 1, col))
+            if above:
+                found.append((row - 1, col))
+        else:
+            ahead, right, left = open_at(row + dr, col), open_at(row, col + 1), open_at(row, col - 1)
+            if ahead:
+                found.append((row + dr, col))
+                if right:
+                    found.append((row + dr, col + 1))
+                if left:
+                    found.append((row + dr, col - 1))
+            if right:
+                found.append((row, col + 1))
+            if left:
+                found.append((row, col - 1))
+        return found
+
+    # 4-connected jump: horizontal runs stop at forced neighbours, vertical
+    # runs also stop wherever a horizontal run would find a jump point
+    def jump4(self, row, col, dr, dc):
+        open_at = self.grid.open_at
+        while True:
+            if not open_at(row, col):
+                return None
+            if (row, col) == self.goal:
+                return row, col
+            if dc:
+                if (open_at(row - 1, col) and not open_at(row - 1, col - dc)) or \
+                        (open_at(row + 1, col) and not open_at(row + 1, col - dc)):
+                    return row, col
+            else:
+                if (open_at(row, col - 1) and not open_at(row - dr, col - 1)) or \
+                        (open_at(row, col + 1) and not open_at(row - dr, col + 1)):
+                    return row, col
+                if self.jump4(row, col + 1, 0, 1) or self.jump4(row, col - 1, 0, -1):
+                    return row, col
+            row, col = row + dr, col + dc
+
+    # 8-connected jump without corner cutting: diagonal runs stop wherever
+    # one of their straight components finds a jump point
+    def jump8(self, row, col, dr, dc):
+        open_at = self.grid.open_at
+        while True:
+            if not open_at(row, col):
+                return None
+            if (row, col) == self.goal:
+                return row, col
+            if dr and dc:
+                if self.jump8(row, col + dc, 0, dc) or self.jump8(row + dr, col, dr, 0):
+                    return row, col
+            elif dc:
+                if (open_at(row - 1, col) and not open_at(row - 1, col - dc)) or \
+                        (open_at(row + 1, col) and not open_at(row + 1, col - dc)):
+                    return row, col
+            else:
+                if (open_at(row, col - 1) and not open_at(row - dr, col - 1)) or \
+                        (open_at(row, col + 1) and not open_at(row - dr, col + 1)):
+                    return row, col
+            if not (open_at(row + dr, col) and open_at(row, col + dc)):
+                return None
+            row, col = row + dr, col + dc
+
+# Greedy or A* search over a binary heap with lazy deletion: instead of a
+# decrease-key, a cheaper route to a cell pushes a new entry and the old one
+# is skipped when it is popped ("stale pop"). Ties on f are broken towards
+# the larger g, which is the deeper node and usually closer to the goal.
+#
+# "jps" runs the same A* loop over jump points instead of neighbours; it
+# needs a grid without digit weights. diagonal=True allows 8-connected
+# movement (diagonal steps cost sqrt(2)) and switches to the octile heuristic.
+# start and goal default to the grid's first "s" and "e" cells. estimate
+# replaces the heuristic: any estimate(grid, index, goal) lower bound works,
+# e.g. the landmark tables in maze_landmarks.py.
+#
+# The observer, if given, is called as observer(event, index) with "push"
+# for every heap push, "expand" for every cell that gets closed and "path"
+# for every cell on the final route (start to goal).
+def solve(grid, algorithm="greedy", observer=None, diagonal=False, start=None, goal=None, estimate=None):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+    started = time.perf_counter()
+    start = grid.start if start is None else start
+    goal = grid.end if goal is None else goal
+    weights = grid.weights
+    greedy = algorithm == "greedy"
+    if estimate is None:
+        estimate = octile if diagonal else heuristic
+    if algorithm == "jps":
+        if weights is not None:
+            raise ValueError("Jump Point Search needs a uniform-cost grid")
+        successors = JumpPoints(grid, goal, diagonal).successors
+    else:
+        successors = lambda index, parent: grid.moves(index, diagonal)
+    parents = array("i", [-1]) * grid.size
+    g_costs = array("d", [float("inf")]) * grid.size
+    closed = bytearray(grid.size)
+    stats = {"expanded": 0, "pushes": 1, "pops": 0, "stale_pops": 0}
+
+    g_costs[start] = 0
+    frontier = [(estimate(grid, start, goal), 0, start)]
+    path = []
+
+    while frontier:
+        _, neg_g, current = heapq.heappop(frontier)
+        stats["pops"] += 1
+        if closed[current] or -neg_g > g_costs[current]:
+            stats["stale_pops"] += 1
+            continue
+        closed[current] = 1
+
+        if current == goal:
+            path = reconstruct_path(parents, current)
+            if algorithm == "jps":
+                path = interpolate_path(grid, path)
+            break
+
+        stats["expanded"] += 1
+        if observer is not None:
+            observer("expand", current)
+
+        g = -neg_g
+        for neighbor, distance in successors(current, parents[current]):
+            if closed[neighbor]:
+                continue
+            new_cost = g + (distance * weights[neighbor] if weights is not None else distance)
+            if new_cost >= g_costs[neighbor]:
+                continue
+            g_costs[neighbor] = new_cost
+            parents[neighbor] = current
+
+            if greedy:
+                priority = estimate(grid, neighbor, goal)
+            else:
+                priority = new_cost + estimate(grid, neighbor, goal)
+
+            heapq.heappush(frontier, (priority, -new_cost, neighbor))
+            stats["pushes"] += 1
+            if observer is not None:
+                observer("push", neighbor)
+
+    if observer is not None:
+        for index in path:
+            observer("path", index)
+
+    cells = [grid.cell(index) for index in path]
+    cost = g_costs[goal] if path else None
+    return SearchResult(algorithm, cells, cost, stats, time.perf_counter() - started)
+
+# Bidirectional search that meets in the middle. "bfs" grows both frontiers
+# by path cost alone (plain BFS order on unweighted grids); "astar" uses the
+# balanced potentials p(v) = (h(v, goal) - h(start, v)) / 2 forward and -p(v)
+# backward, which keep both searches consistent. Either way the search stops
+# once the two smallest keys add up to at least the best meeting cost, so the
+# returned path is optimal. The backward search walks edges in reverse: moving
+# from v back to u costs what stepping from u into v costs. estimate works as
+# in solve() and must be a consistent lower bound in both directions; an
+# estimate with a potential(grid, start, goal) method supplies p(v) itself.
+def solve_bidirectional(grid, algorithm="astar", observer=None, diagonal=False, start=None, goal=None,
+                        estimate=None):
+    if algorithm not in BIDIRECTIONAL_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {BIDIRECTIONAL_ALGORITHMS}")
+
+    started = time.perf_counter()
+    start = grid.start if start is None else start
+    goal = grid.end if goal is None else goal
+    weights = grid.weights
+    if estimate is None:
+        estimate = octile if diagonal else heuristic
+
+    if algorithm == "astar" and hasattr(estimate, "potential"):
+        potential = estimate.potential(grid, start, goal)
+    elif algorithm == "astar":
+        potential = lambda index: (estimate(grid, index, goal) - estimate(grid, start, index)) / 2
+    else:
+        potential = lambda index: 0
+
+    # Index 0 is the forward search from start, index 1 the backward one from goal
+    parents = [array("i", [-1]) * grid.size, array("i", [-1]) * grid.size]
+    g_costs = [array("d", [float("inf")]) * grid.size, array("d", [float("inf")]) * grid.size]
+    closed = [bytearray(grid.size), bytearray(grid.size)]
+    frontiers = [[(potential(start), 0, start)], [(-potential(goal), 0, goal)]]
+    signs = (1, -1)
+    stats = {"expanded": 0, "pushes": 2, "pops": 0, "stale_pops": 0}
+    g_costs[0][start] = 0
+    g_costs[1][goal] = 0
+    best, meeting = (0, start) if start == goal else (float("inf"), -1)
+
+    while frontiers[0] and frontiers[1]:
+        if frontiers[0][0][0] + frontiers[1][0][0] >= best:
+            break
+
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        _, neg_g, current = heapq.heappop(frontiers[side])
+        stats["pops"] += 1
+        if closed[side][current] or -neg_g > g_costs[side][current]:
+            stats["stale_pops"] += 1
+            continue
+        closed[side][current] = 1
+        stats["expanded"] += 1
+        if observer is not None:
+            observer("expand", current)
+
+        g = -neg_g
+        own_g, other_g = g_costs[side], g_costs[1 - side]
+        for neighbor, distance in grid.moves(current, diagonal):
+            if closed[side][neighbor]:
+                continue
+            entered = neighbor if side == 0 else current
+            new_cost = g + (distance * weights[entered] if weights is not None else distance)
+            if new_cost >= own_g[neighbor]:
+                continue
+            own_g[neighbor] = new_cost
+            parents[side][neighbor] = current
+            heapq.heappush(frontiers[side], (new_cost + signs[side] * potential(neighbor), -new_cost, neighbor))
+            stats["pushes"] += 1
+            if observer is not None:
+                observer("push", neighbor)
+
+            if new_cost + other_g[neighbor] < best:
+                best, meeting = new_cost + other_g[neighbor], neighbor
+
+    path = []
+    if meeting != -1:
+        path = reconstruct_path(parents[0], meeting)
+        index = parents[1][meeting]
+        while index != -1:
+            path.append(index)
+            index = parents[1][index]
+
+    if observer is not None:
+        for index in path:
+            observer("path", index)
+
+    cells = [grid.cell(index) for index in path]
+    cost = best if path else None
+    return SearchResult(f"bidirectional-{algorithm}", cells, cost, stats, time.perf_counter() - started)
+
+# Single-source Dijkstra over the whole grid. With reverse=True the distances
+# are *to* source rather than from it (edges are walked backwards), which is
+# what many robots heading for one dock need. Passing targets stops the
+# search once all of them are settled.
+class DistanceField:
+    def __init__(self, grid, source, diagonal=False, reverse=False, targets=None):
+        self.grid = grid
+        self.source = source
+        self.reverse = reverse
+        self.distances = array("d", [float("inf")]) * grid.size
+        self.parents = array("i", [-1]) * grid.size
+        self.stats = {"expanded": 0, "pushes": 1, "pops": 0, "stale_pops": 0}
+
+        started = time.perf_counter()
+        self._run(diagonal, targets)
+        self.elapsed = time.perf_counter() - started
+
+    def _run(self, diagonal, targets):
+        grid, weights = self.grid, self.grid.weights
+        distances, parents, stats = self.distances, self.parents, self.stats
+        closed = bytearray(grid.size)
+        remaining = set(targets) if targets is not None else None
+        distances[self.source] = 0
+        frontier = [(0, self.source)]
+
+        while frontier:
+            g, current = heapq.heappop(frontier)
+            stats["pops"] += 1
+            if closed[current]:
+                stats["stale_pops"] += 1
+                continue
+            closed[current] = 1
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    break
+            stats["expanded"] += 1
+
+            for neighbor, distance in grid.moves(current, diagonal):
+                if closed[neighbor]:
+                    continue
+                entered = current if self.reverse else neighbor
+                new_cost = g + (distance * weights[entered] if weights is not None else distance)
+                if new_cost < distances[neighbor]:
+                    distances[neighbor] = new_cost
+                    parents[neighbor] = current
+                    heapq.heappush(frontier, (new_cost, neighbor))
+                    stats["pushes"] += 1
+
+    def cost(self, index):
+        distance = self.distances[index]
+        return distance if distance != float("inf") else None
+
+    # Path between index and the source, always ordered in travel direction
+    def path(self, index):
+        if self.cost(index) is None:
+            return []
+        path = reconstruct_path(self.parents, index)
+        return path if not self.reverse else path[::-1]
+
+    def result(self, index):
+        path = [self.grid.cell(cell) for cell in self.path(index)]
+        return SearchResult("dijkstra", path, self.cost(index), self.stats, self.elapsed)
+
+# Answer every (start, goal) pair with one Dijkstra pass per goal, or a
+# single forward pass when there is only one start. Defaults to all "s" and
+# "e" cells of the grid. Returns {(start, goal): SearchResult}; results from
+# the same pass share its expansion counters and time.
+def solve_multi(grid, starts=None, goals=None, diagonal=False):
+    starts = grid.starts if starts is None else starts
+    goals = grid.ends if goals is None else goals
+
+    results = {}
+    if len(starts) == 1:
+        field = DistanceField(grid, starts[0], diagonal, targets=goals)
+        for goal in goals:
+            results[starts[0], goal] = field.result(goal)
+        return results
+
+    for goal in goals:
+        field = DistanceField(grid, goal, diagonal, reverse=True, targets=starts)
+        for start in starts:
+            results[start, goal] = field.result(start)
+    return results
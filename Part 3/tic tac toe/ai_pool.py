@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from game import TicTacToe
+from solved_table import DEFAULT_PATH, load_solved_table
+
+# Runs get_best_move() in worker processes so a long search never holds a
+# request thread's CPU, at most `workers` searches run at once, and every move
+# has a deadline.
+
+# Seconds a request waits for an AI move, including time queued for a worker
+MOVE_DEADLINE = float(os.environ.get("AI_MOVE_DEADLINE", "5.0"))
+# Part of the deadline kept back for the trip to and from the worker
+DEADLINE_MARGIN = 0.25
+
+class MoveTimeout(Exception):
+    pass
+
+def _init_worker(table_path):
+    if table_path and os.path.exists(table_path):
+        load_solved_table(table_path).install()
+
+# Runs in a worker on a copy of the position: masks, side to move and settings
+def _best_move(rows, cols, k, x_mask, o_mask, player, difficulty, time_limit):
+    game = TicTacToe(rows, cols, k, time_limit)
+    game.x_mask = x_mask
+    game.o_mask = o_mask
+    game.current_player = player
+    game.difficulty = difficulty
+    return game.get_best_move()
+
+class AIPool:
+    def __init__(self, workers=None, max_pending=None, deadline=MOVE_DEADLINE, table_path=DEFAULT_PATH):
+        workers = workers or os.cpu_count() or 1
+        self.deadline = deadline
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(table_path,))
+        # Searches queued or running; beyond this, requests wait (up to their deadline) for a slot
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 4)
+
+    # Best move for game within deadline seconds, or MoveTimeout. Large boards
+    # are told to stop iterative deepening before the deadline; a search still
+    # waiting for a worker when it passes is cancelled.
+    def best_move(self, game, deadline=None):
+        deadline = self.deadline if deadline is None else deadline
+        expires = time.monotonic() + deadline
+        if not self.slots.acquire(timeout=deadline):
+            raise MoveTimeout("AI is busy, no move within %.1f seconds" % deadline)
+
+        # The search only gets what is left after waiting for the slot
+        remaining = expires - time.monotonic()
+        if remaining <= DEADLINE_MARGIN:
+            self.slots.release()
+            raise MoveTimeout("AI is busy, no move within %.1f seconds" % deadline)
+
+        geometry = game.geometry
+        time_limit = max(0.01, min(game.time_limit, remaining - DEADLINE_MARGIN))
+        try:
+            future = self.executor.submit(
+                _best_move, geometry.rows, geometry.cols, geometry.k,
+                game.x_mask, game.o_mask, game.current_player, game.difficulty, time_limit)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+
+        try:
+            return future.result(timeout=max(0.0, expires - time.monotonic()))
+        except TimeoutError:
+            future.cancel()
+            raise MoveTimeout("no AI move within %.1f seconds" % deadline)
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
@@ -1,8 +1,49 @@
-from flask import Flask, render_template, request, jsonify
-from game import TicTacToe
+import json
+import os
+import uuid
+from contextlib import contextmanager
+
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
+from ai_pool import AIPool, MoveTimeout
+from game_store import GameStore
+from solved_table import ensure_solved_table
 
 app = Flask(__name__)
-game = TicTacToe()
+# Signs the session cookie; set SECRET_KEY so sessions survive restarts and are
+# shared by every worker
+app.secret_key = os.environ.get("SECRET_KEY") or os.urandom(32)
+# One game per session, held in memory by this process
+games = GameStore()
+# "impossible" moves come from the precomputed table rather than a search
+ensure_solved_table()
+# AI moves are searched in worker processes, each with a deadline
+ai = AIPool()
+
+def session_id():
+    if "game_id" not in session:
+        session["game_id"] = uuid.uuid4().hex
+    return session["game_id"]
+
+# The caller's game, locked for the rest of the request
+@contextmanager
+def current_game():
+    with games.checkout(session_id()) as game:
+        yield game
+
+# Puts the game back as it was if the AI times out inside the block, so the
+# request fails with 503 and the player can simply try again
+@contextmanager
+def undo_on_timeout(game):
+    saved = game.x_mask, game.o_mask, game.current_player, game.game_mode, game.difficulty
+    try:
+        yield
+    except MoveTimeout:
+        game.x_mask, game.o_mask, game.current_player, game.game_mode, game.difficulty = saved
+        raise
+
+@app.errorhandler(MoveTimeout)
+def move_timeout(error):
+    return jsonify({'error': str(error)}), 503
 
 @app.route('/')
 def index():
@@ -12,111 +53,155 @@ def index():
 def make_move():
     data = request.get_json()
     position = data.get('position')
-    
-    if game.make_move(position):
-        winner, winning_combo = game.check_winner()
-        
-        if winner:
-            update_scores(winner)
-            return jsonify({
-                'board': game.board,
-                'currentPlayer': game.current_player,
-                'gameOver': True,
-                'winner': winner,
-                'winningCombo': winning_combo,
-                'scores': game.scores
-            })
-            
-        if game.game_mode == "human_vs_ai":
-            ai_position = game.get_best_move()
+
+    with current_game() as game, undo_on_timeout(game):
+        if game.make_move(position):
+            winner, winning_combo = game.check_winner()
+
+            if winner:
+                update_scores(game, winner)
+                return jsonify({
+                    'board': game.board,
+                    'currentPlayer': game.current_player,
+                    'gameOver': True,
+                    'winner': winner,
+                    'winningCombo': winning_combo,
+                    'scores': game.scores
+                })
+
+            if game.game_mode == "human_vs_ai":
+                ai_position = ai.best_move(game)
+                game.make_move(ai_position)
+                winner, winning_combo = game.check_winner()
+
+                if winner:
+                    update_scores(game, winner)
+
+                return jsonify({
+                    'board': game.board,
+                    'currentPlayer': game.current_player,
+                    'gameOver': winner is not None,
+                    'winner': winner,
+                    'winningCombo': winning_combo,
+                    'scores': game.scores
+                })
+
+        return jsonify({
+            'board': game.board,
+            'currentPlayer': game.current_player,
+            'gameOver': False,
+            'winner': None,
+            'scores': game.scores
+        })
+
+@app.route('/ai_vs_ai', methods=['POST'])
+def ai_vs_ai():
+    with current_game() as game, undo_on_timeout(game):
+        game.reset_board()
+        game.game_mode = "ai_vs_ai"
+
+        moves_history = []
+
+        while True:
+            ai_position = ai.best_move(game)
             game.make_move(ai_position)
+            moves_history.append({
+                'position': ai_position,
+                'player': "X" if game.current_player == "O" else "O"
+            })
+
             winner, winning_combo = game.check_winner()
-            
             if winner:
-                update_scores(winner)
-                
-            return jsonify({
-                'board': game.board,
-                'currentPlayer': game.current_player,
-                'gameOver': winner is not None,
+                update_scores(game, winner)
+                break
+
+        return jsonify({
+            'board': game.board,
+            'moves': moves_history,
+            'gameOver': True,
+            'winner': winner,
+            'winningCombo': winning_combo,
+            'scores': game.scores
+        })
+
+# Same game as /ai_vs_ai, but each move is sent as a line of JSON as soon as it
+# is found instead of all at once at the end
+@app.route('/ai_vs_ai/stream', methods=['POST'])
+def ai_vs_ai_stream():
+    game_id = session_id()
+
+    def moves():
+        with games.checkout(game_id) as game:
+            try:
+                with undo_on_timeout(game):
+                    game.reset_board()
+                    game.game_mode = "ai_vs_ai"
+
+                    while True:
+                        ai_position = ai.best_move(game)
+                        game.make_move(ai_position)
+                        yield json.dumps({
+                            'position': ai_position,
+                            'player': "X" if game.current_player == "O" else "O",
+                            'board': game.board
+                        }) + "\n"
+
+                        winner, winning_combo = game.check_winner()
+                        if winner:
+                            update_scores(game, winner)
+                            break
+            except MoveTimeout as error:
+                yield json.dumps({'error': str(error)}) + "\n"
+                return
+
+            yield json.dumps({
+                'gameOver': True,
                 'winner': winner,
                 'winningCombo': winning_combo,
                 'scores': game.scores
-            })
-    
-    return jsonify({
-        'board': game.board,
-        'currentPlayer': game.current_player,
-        'gameOver': False,
-        'winner': None,
-        'scores': game.scores
-    })
+            }) + "\n"
 
-@app.route('/ai_vs_ai', methods=['POST'])
-def ai_vs_ai():
-    game.reset_board()
-    game.game_mode = "ai_vs_ai"
-    
-    moves_history = []
-    
-    while True:
-        ai_position = game.get_best_move()
-        game.make_move(ai_position)
-        moves_history.append({
-            'position': ai_position,
-            'player': "X" if game.current_player == "O" else "O"
-        })
-        
-        winner, winning_combo = game.check_winner()
-        if winner:
-            update_scores(winner)
-            break
-    
-    return jsonify({
-        'board': game.board,
-        'moves': moves_history,
-        'gameOver': True,
-        'winner': winner,
-        'winningCombo': winning_combo,
-        'scores': game.scores
-    })
+    return Response(stream_with_context(moves()), mimetype='application/x-ndjson')
 
 @app.route('/set_game_options', methods=['POST'])
 def set_game_options():
     data = request.get_json()
-    game.game_mode = data.get('gameMode', 'human_vs_ai')
-    game.difficulty = data.get('difficulty', 'impossible')
-    player_choice = data.get('playerChoice', 'X')
-    
-    game.reset_board()
-    
-    if game.game_mode == "human_vs_ai" and player_choice == "O":
-        game.current_player = "X"
-        ai_position = game.get_best_move()
-        game.make_move(ai_position)
-    else:
-        game.current_player = "X"
-    
-    return jsonify({
-        'board': game.board,
-        'currentPlayer': game.current_player,
-        'gameOver': False,
-        'winner': None,
-        'scores': game.scores
-    })
+
+    with current_game() as game, undo_on_timeout(game):
+        game.game_mode = data.get('gameMode', 'human_vs_ai')
+        game.difficulty = data.get('difficulty', 'impossible')
+        player_choice = data.get('playerChoice', 'X')
+
+        game.reset_board()
+
+        if game.game_mode == "human_vs_ai" and player_choice == "O":
+            game.current_player = "X"
+            ai_position = ai.best_move(game)
+            game.make_move(ai_position)
+        else:
+            game.current_player = "X"
+
+        return jsonify({
+            'board': game.board,
+            'currentPlayer': game.current_player,
+            'gameOver': False,
+            'winner': None,
+            'scores': game.scores
+        })
 
 @app.route('/reset_game', methods=['POST'])
 def reset_game():
-    game.reset_board()
-    return jsonify({
-        'board': game.board,
-        'currentPlayer': game.current_player,
-        'gameOver': False,
-        'winner': None,
-        'scores': game.scores
-    })
-
-def update_scores(winner):
+    with current_game() as game:
+        game.reset_board()
+        return jsonify({
+            'board': game.board,
+            'currentPlayer': game.current_player,
+            'gameOver': False,
+            'winner': None,
+            'scores': game.scores
+        })
+
+def update_scores(game, winner):
     if winner == "tie":
         game.scores["tie"] += 1
     else:
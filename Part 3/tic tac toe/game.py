@@ -1,60 +1,253 @@
+import time
+
+# Boards with at most this many squares are solved outright by minimax; larger
+# ones get a time-limited iterative-deepening search with a heuristic cutoff
+EXACT_SQUARES = 9
+# Score of a win in the depth-limited search, far above any heuristic value
+WIN_SCORE = 10 ** 9
+# On large boards only empty squares this close to a stone are searched
+NEAR_RADIUS = 2
+# Nodes searched between clock checks
+TIME_CHECK_INTERVAL = 1024
+# The depth-limited search clears its table instead of growing past this
+TABLE_LIMIT = 1000000
+# Depth caps for the weaker AIs on large boards
+DIFFICULTY_DEPTHS = {"easy": 1, "medium": 2}
+
+# Transposition table bound flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Squares set in mask, lowest first. Bit i of a mask is square i, row by row.
+def squares(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+# Every k-in-a-row line as a bitmask: rows, then columns, then both diagonals
+def win_masks(rows, cols, k):
+    masks = []
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for r in range(rows):
+            for c in range(cols):
+                if 0 <= r + dr * (k - 1) < rows and 0 <= c + dc * (k - 1) < cols:
+                    masks.append(sum(1 << (r + dr * i) * cols + c + dc * i for i in range(k)))
+    return masks
+
+# The symmetries of the board as index permutations: transformed[i] = board[perm[i]].
+# Rectangular boards have 4, square ones 8.
+def symmetries(rows, cols):
+    transforms = [
+        lambda r, c: (r, c),
+        lambda r, c: (rows - 1 - r, cols - 1 - c),
+        lambda r, c: (r, cols - 1 - c),
+        lambda r, c: (rows - 1 - r, c),
+    ]
+    if rows == cols:
+        transforms += [
+            lambda r, c: (c, r),
+            lambda r, c: (cols - 1 - c, rows - 1 - r),
+            lambda r, c: (cols - 1 - c, r),
+            lambda r, c: (c, rows - 1 - r),
+        ]
+    perms = []
+    for transform in transforms:
+        perm = []
+        for r in range(rows):
+            for c in range(cols):
+                tr, tc = transform(r, c)
+                perm.append(tr * cols + tc)
+        perms.append(perm)
+    return perms
+
+# Everything about an m x n, k-in-a-row board that does not depend on the
+# position. Built once per size and shared by every game of that size.
+class Geometry:
+    def __init__(self, rows, cols, k):
+        if rows < 1 or cols < 1 or not 1 <= k <= max(rows, cols):
+            raise ValueError("k must be between 1 and the longest side of the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full_mask = (1 << self.size) - 1
+        self.exact = self.size <= EXACT_SQUARES
+        # Wins score win_score - depth; anything at or above win_threshold is a win
+        self.win_score = self.size + 1 if self.exact else WIN_SCORE
+        self.win_threshold = self.win_score - self.size
+        self.win_masks = win_masks(rows, cols, k)
+        self.win_combos = [list(squares(mask)) for mask in self.win_masks]
+        self.lines_through = [[mask for mask in self.win_masks if mask >> i & 1] for i in range(self.size)]
+        self.near = [
+            sum(1 << r * cols + c
+                for r in range(max(0, i // cols - NEAR_RADIUS), min(rows, i // cols + NEAR_RADIUS + 1))
+                for c in range(max(0, i % cols - NEAR_RADIUS), min(cols, i % cols + NEAR_RADIUS + 1)))
+            for i in range(self.size)
+        ]
+        # Small tie-breaker for move ordering: squares nearer the centre first
+        self.centrality = [
+            1 / (1 + abs(i // cols - (rows - 1) / 2) + abs(i % cols - (cols - 1) / 2))
+            for i in range(self.size)
+        ]
+        self.transposition_table = {}
+        # Perfect-play lookup table, installed by solved_table.py
+        self.solved_table = None
+
+        if self.exact:
+            # has_win[mask] is 1 when the squares in mask contain a complete line
+            self.has_win = bytearray(1 << self.size)
+            for mask in range(1 << self.size):
+                self.has_win[mask] = any(mask & win == win for win in self.win_masks)
+            # symmetry_tables[s][mask] is mask transformed by symmetry s
+            self.symmetry_tables = [
+                [sum(1 << i for i, index in enumerate(perm) if mask >> index & 1) for mask in range(1 << self.size)]
+                for perm in symmetries(rows, cols)
+            ]
+
+_GEOMETRIES = {}
+
+def geometry(rows, cols, k):
+    key = (rows, cols, k)
+    if key not in _GEOMETRIES:
+        _GEOMETRIES[key] = Geometry(rows, cols, k)
+    return _GEOMETRIES[key]
+
+# Raised inside the depth-limited search when the clock runs out
+class SearchTimeout(Exception):
+    pass
+
 class TicTacToe:
-    def __init__(self):
-        self.board = [" " for _ in range(9)]
+    # rows x cols board, k in a row to win. The classic game is 3, 3, 3; 4x4,
+    # 5x5 or gomoku (15, 15, 5) boards are searched to a depth that fits in
+    # time_limit seconds per move.
+    # Slots keep each game to a few hundred bytes; the server holds one per session.
+    __slots__ = ("geometry", "transposition_table", "time_limit", "x_mask", "o_mask", "current_player",
+                 "difficulty", "game_mode", "scores", "nodes", "deadline", "killers", "history")
+
+    def __init__(self, rows=3, cols=3, k=3, time_limit=1.0):
+        self.geometry = geometry(rows, cols, k)
+        # Shared by every game of this size, so positions solved for one request are free for the next
+        self.transposition_table = self.geometry.transposition_table
+        self.time_limit = time_limit
+        self.x_mask = 0
+        self.o_mask = 0
         self.current_player = "X"
-        self.difficulty = "impossible"  
-        self.game_mode = "human_vs_ai"  
+        self.difficulty = "impossible"
+        self.game_mode = "human_vs_ai"
         self.scores = {"X": 0, "O": 0, "tie": 0}
-        
+        # Positions searched by this game so far, for benchmarks
+        self.nodes = 0
+
+    # The board as a list of " ", "X" and "O", which is what the JSON API sends
+    @property
+    def board(self):
+        return ["X" if self.x_mask >> i & 1 else "O" if self.o_mask >> i & 1 else " " for i in range(self.geometry.size)]
+
+    @board.setter
+    def board(self, board):
+        self.x_mask = sum(1 << i for i, spot in enumerate(board) if spot == "X")
+        self.o_mask = sum(1 << i for i, spot in enumerate(board) if spot == "O")
+
     def available_moves(self):
-        return [i for i, spot in enumerate(self.board) if spot == " "]
-        
+        return list(squares(~(self.x_mask | self.o_mask) & self.geometry.full_mask))
+
+    # Returns False for an occupied square or anything that is not a square
+    # on this board
     def make_move(self, position):
-        if self.board[position] == " ":
-            self.board[position] = self.current_player
+        if not isinstance(position, int) or isinstance(position, bool) or not 0 <= position < self.geometry.size:
+            return False
+        bit = 1 << position
+        if not (self.x_mask | self.o_mask) & bit:
+            if self.current_player == "X":
+                self.x_mask |= bit
+            else:
+                self.o_mask |= bit
             self.current_player = "O" if self.current_player == "X" else "X"
             return True
         return False
-    
+
     def check_winner(self):
-        winning_combinations = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  
-            [0, 4, 8], [2, 4, 6]              
-        ]
-        
-        for combo in winning_combinations:
-            if self.board[combo[0]] != " " and self.board[combo[0]] == self.board[combo[1]] == self.board[combo[2]]:
-                return self.board[combo[0]], combo
-        
-        if " " not in self.board:
+        geometry = self.geometry
+        for combo, win in zip(geometry.win_combos, geometry.win_masks):
+            if self.x_mask & win == win:
+                return "X", combo
+            if self.o_mask & win == win:
+                return "O", combo
+
+        if self.x_mask | self.o_mask == geometry.full_mask:
             return "tie", None
-            
+
         return None, None
-    
+
+    # Smallest encoding of the board over all its symmetries, plus the side to move
+    def canonical_key(self, is_maximizing):
+        x_mask, o_mask, size = self.x_mask, self.o_mask, self.geometry.size
+        key = min(table[x_mask] << size | table[o_mask] for table in self.geometry.symmetry_tables)
+        return key * 2 + is_maximizing
+
+    # Scores depend on depth (win_score - depth), so the table stores them relative
+    # to the node: a win in k more moves is stored the same way whatever the depth.
+    def to_table_score(self, score, depth):
+        threshold = self.geometry.win_threshold
+        return score + depth if score >= threshold else score - depth if score <= -threshold else score
+
+    def from_table_score(self, score, depth):
+        threshold = self.geometry.win_threshold
+        return score - depth if score >= threshold else score + depth if score <= -threshold else score
+
+    # Exact search, used on boards of at most EXACT_SQUARES squares
     def minimax(self, depth, is_maximizing, alpha=float('-inf'), beta=float('inf')):
-        result, _ = self.check_winner()
-        
-        if result == "X":
-            return 10 - depth
-        elif result == "O":
-            return -10 + depth
-        elif result == "tie":
+        self.nodes += 1
+        geometry = self.geometry
+        if geometry.has_win[self.x_mask]:
+            return geometry.win_score - depth
+        elif geometry.has_win[self.o_mask]:
+            return -geometry.win_score + depth
+        elif self.x_mask | self.o_mask == geometry.full_mask:
             return 0
-            
+
         if self.difficulty != "impossible" and depth == 0:
             import random
             if self.difficulty == "easy" and random.random() < 0.7:
                 return random.randint(-5, 5)
             elif self.difficulty == "medium" and random.random() < 0.4:
                 return random.randint(-5, 5)
-        
+
+        key = self.canonical_key(is_maximizing)
+        entry = self.transposition_table.get(key)
+        if entry is not None:
+            flag, stored = entry
+            score = self.from_table_score(stored, depth)
+            if flag == EXACT:
+                return score
+            elif flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return score
+
+        best_score = self.search(depth, is_maximizing, alpha, beta)
+
+        if best_score <= alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transposition_table[key] = (flag, self.to_table_score(best_score, depth))
+        return best_score
+
+    def search(self, depth, is_maximizing, alpha, beta):
+        empty = ~(self.x_mask | self.o_mask) & self.geometry.full_mask
         if is_maximizing:
             best_score = float('-inf')
-            for move in self.available_moves():
-                self.board[move] = "X"
+            while empty:
+                bit = empty & -empty
+                empty ^= bit
+                self.x_mask |= bit
                 score = self.minimax(depth + 1, False, alpha, beta)
-                self.board[move] = " "
+                self.x_mask ^= bit
                 best_score = max(score, best_score)
                 alpha = max(alpha, best_score)
                 if beta <= alpha:
@@ -62,35 +255,215 @@ class TicTacToe:
             return best_score
         else:
             best_score = float('inf')
-            for move in self.available_moves():
-                self.board[move] = "O"
+            while empty:
+                bit = empty & -empty
+                empty ^= bit
+                self.o_mask |= bit
                 score = self.minimax(depth + 1, True, alpha, beta)
-                self.board[move] = " "
+                self.o_mask ^= bit
                 best_score = min(score, best_score)
                 beta = min(beta, best_score)
                 if beta <= alpha:
                     break
             return best_score
-    
+
+    # Heuristic value of a position for X at the depth cutoff: every line still
+    # open to only one player is worth 4 ** (its stones), so longer threats dominate.
+    def evaluate(self):
+        x_mask, o_mask = self.x_mask, self.o_mask
+        score = 0
+        for line in self.geometry.win_masks:
+            x_line = x_mask & line
+            o_line = o_mask & line
+            if x_line and not o_line:
+                score += 1 << 2 * x_line.bit_count()
+            elif o_line and not x_line:
+                score -= 1 << 2 * o_line.bit_count()
+        limit = WIN_SCORE // 2
+        return max(-limit, min(limit, score))
+
+    # True if mask, which just gained square, now holds a line through it
+    def wins(self, mask, square):
+        for line in self.geometry.lines_through[square]:
+            if mask & line == line:
+                return True
+        return False
+
+    # Candidate moves, best first: the table move, the killers for this ply,
+    # then the rest by history score with central squares breaking ties
+    def ordered_moves(self, ply, hash_move):
+        geometry = self.geometry
+        occupied = self.x_mask | self.o_mask
+        candidates = ~occupied & geometry.full_mask
+        if occupied:
+            near = 0
+            for square in squares(occupied):
+                near |= geometry.near[square]
+            candidates &= near
+
+        history, centrality = self.history, geometry.centrality
+        moves = sorted(squares(candidates), key=lambda move: history[move] + centrality[move], reverse=True)
+
+        first = []
+        for move in (hash_move, *self.killers[ply]):
+            if move is not None and candidates >> move & 1 and move not in first:
+                first.append(move)
+        if not first:
+            return moves
+        return first + [move for move in moves if move not in first]
+
+    # Moves that caused a cutoff are tried early elsewhere: at the same ply as
+    # killers, and everywhere through the history table
+    def record_cutoff(self, move, ply, depth):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[move] += depth * depth
+
+    # Depth-limited alpha-beta for large boards; depth is the remaining search
+    # depth and ply the distance from the root. Table entries keep the depth
+    # they were searched to and their best move.
+    def alphabeta(self, depth, ply, is_maximizing, alpha, beta):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        geometry = self.geometry
+        if self.x_mask | self.o_mask == geometry.full_mask:
+            return 0
+        if depth == 0:
+            return self.evaluate()
+
+        key = (self.x_mask << geometry.size | self.o_mask) * 2 + is_maximizing
+        entry = self.transposition_table.get(key)
+        hash_move = None
+        if entry is not None:
+            flag, stored, draft, hash_move = entry
+            # The root always searches its moves so that it has a move to play
+            if draft >= depth and ply:
+                score = self.from_table_score(stored, ply)
+                if flag == EXACT:
+                    return score
+                elif flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if beta <= alpha:
+                    return score
+
+        best_score, best_move = self.expand(depth, ply, is_maximizing, alpha, beta, hash_move)
+
+        if best_score <= alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transposition_table[key] = (flag, self.to_table_score(best_score, ply), depth, best_move)
+        return best_score
+
+    def expand(self, depth, ply, is_maximizing, alpha, beta, hash_move):
+        win = self.geometry.win_score - ply - 1
+        best_move = None
+        if is_maximizing:
+            best_score = float('-inf')
+            for move in self.ordered_moves(ply, hash_move):
+                bit = 1 << move
+                self.x_mask |= bit
+                if self.wins(self.x_mask, move):
+                    score = win
+                else:
+                    score = self.alphabeta(depth - 1, ply + 1, False, alpha, beta)
+                self.x_mask ^= bit
+                if score > best_score:
+                    best_score, best_move = score, move
+                alpha = max(alpha, best_score)
+                if beta <= alpha:
+                    self.record_cutoff(move, ply, depth)
+                    break
+        else:
+            best_score = float('inf')
+            for move in self.ordered_moves(ply, hash_move):
+                bit = 1 << move
+                self.o_mask |= bit
+                if self.wins(self.o_mask, move):
+                    score = -win
+                else:
+                    score = self.alphabeta(depth - 1, ply + 1, True, alpha, beta)
+                self.o_mask ^= bit
+                if score < best_score:
+                    best_score, best_move = score, move
+                beta = min(beta, best_score)
+                if beta <= alpha:
+                    self.record_cutoff(move, ply, depth)
+                    break
+        return best_score, best_move
+
+    # Search depth 1, 2, 3, ... until the time limit and play the best move of
+    # the deepest search that finished. Each pass seeds the move ordering of the
+    # next through the table, the killers and the history scores.
+    def iterative_deepening(self, time_limit=None, max_depth=None):
+        geometry = self.geometry
+        if len(self.transposition_table) > TABLE_LIMIT:
+            self.transposition_table.clear()
+        self.deadline = time.perf_counter() + (self.time_limit if time_limit is None else time_limit)
+        self.killers = [[None, None] for _ in range(geometry.size + 1)]
+        self.history = [0] * geometry.size
+
+        is_maximizing = self.current_player == "X"
+        x_mask, o_mask = self.x_mask, self.o_mask
+        moves = self.ordered_moves(0, None)
+        if not moves:
+            return None
+        best_move = moves[0]
+
+        remaining = geometry.size - (x_mask | o_mask).bit_count()
+        if max_depth is None or max_depth > remaining:
+            max_depth = remaining
+        key = (x_mask << geometry.size | o_mask) * 2 + is_maximizing
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self.alphabeta(depth, 0, is_maximizing, float('-inf'), float('inf'))
+            except SearchTimeout:
+                self.x_mask, self.o_mask = x_mask, o_mask
+                break
+            best_move = self.transposition_table[key][3]
+            if abs(score) >= geometry.win_threshold:
+                break
+        return best_move
+
     def get_best_move(self):
+        if not self.geometry.exact:
+            return self.iterative_deepening(max_depth=DIFFICULTY_DEPTHS.get(self.difficulty))
+
+        if self.difficulty == "impossible" and self.geometry.solved_table is not None:
+            solved = self.geometry.solved_table.lookup(self.x_mask, self.o_mask, self.current_player)
+            if solved is not None:
+                return solved[0]
+
         best_score = float('-inf') if self.current_player == "X" else float('inf')
         best_move = None
-        
+
         for move in self.available_moves():
-            self.board[move] = self.current_player
+            bit = 1 << move
             if self.current_player == "X":
+                self.x_mask |= bit
                 score = self.minimax(0, False)
+                self.x_mask ^= bit
                 if score > best_score:
                     best_score = score
                     best_move = move
             else:
+                self.o_mask |= bit
                 score = self.minimax(0, True)
+                self.o_mask ^= bit
                 if score < best_score:
                     best_score = score
                     best_move = move
-            self.board[move] = " "
-            
+
         return best_move
-    
+
     def reset_board(self):
-        self.board = [" " for _ in range(9)]
+        self.x_mask = 0
+        self.o_mask = 0
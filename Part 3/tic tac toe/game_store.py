@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from game import TicTacToe
+
+# One TicTacToe per browser session, safe to use from many request threads.
+#
+# Games are kept in least-recently-used order. A game that has not been
+# touched for ttl seconds is dropped, and so is the oldest one whenever more
+# than max_games are held. The store lock only guards the dictionary; each
+# game has its own lock, held for the whole request, so a slow AI move in one
+# session never blocks another.
+class GameStore:
+    def __init__(self, max_games=200000, ttl=3600.0, factory=TicTacToe):
+        self.max_games = max_games
+        self.ttl = ttl
+        self.factory = factory
+        self.games = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.games)
+
+    # Drop expired games from the old end, then the oldest over capacity.
+    # Called with self.lock held.
+    def _evict(self, now):
+        while self.games:
+            _, (_, _, last_used) = next(iter(self.games.items()))
+            if now - last_used <= self.ttl and len(self.games) <= self.max_games:
+                break
+            self.games.popitem(last=False)
+
+    # Hold the game for session_id (created on first use) for a request
+    @contextmanager
+    def checkout(self, session_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.games.pop(session_id, None)
+            if entry is None:
+                entry = (self.factory(), threading.Lock(), now)
+            game, game_lock, _ = entry
+            self.games[session_id] = (game, game_lock, now)
+            self._evict(now)
+
+        with game_lock:
+            yield game
+
+    def discard(self, session_id):
+        with self.lock:
+            self.games.pop(session_id, None)
@@ -0,0 +1,111 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game import TicTacToe
+from solved_table import DEFAULT_PATH, load_solved_table
+
+# Headless AI-vs-AI self-play: plays many games per difficulty across all cores
+# and reports win/draw rates, games per second and search nodes per second.
+# Run it before and after every change to the search as a regression check:
+#
+#   python self_play.py --games 100000
+#   python self_play.py --difficulties impossible --cold --games 2000
+#   python self_play.py --rows 4 --cols 4 --k 4 --time-limit 0.05 --games 20
+#
+# By default "impossible" moves are searched; --table answers them from the
+# solved table instead, as the web app does.
+
+DIFFICULTIES = ("easy", "medium", "impossible")
+
+# Play one chunk of games in a worker and return its totals
+def play_games(task):
+    difficulty, games, seed, rows, cols, k, time_limit, cold, table_path = task
+    random.seed(seed)
+    if table_path:
+        load_solved_table(table_path).install()
+
+    game = TicTacToe(rows, cols, k, time_limit)
+    game.difficulty = difficulty
+    totals = {"X": 0, "O": 0, "tie": 0, "moves": 0, "nodes": 0, "search_time": 0.0}
+    for _ in range(games):
+        if cold:
+            game.transposition_table.clear()
+        game.reset_board()
+        game.current_player = "X"
+        while True:
+            nodes = game.nodes
+            start = time.perf_counter()
+            game.make_move(game.get_best_move())
+            totals["search_time"] += time.perf_counter() - start
+            totals["nodes"] += game.nodes - nodes
+            totals["moves"] += 1
+
+            winner, _ = game.check_winner()
+            if winner:
+                totals[winner] += 1
+                break
+    return totals
+
+# Split games into chunks so every worker gets several and the seeds differ
+def tasks(difficulty, games, seed, chunk, options):
+    for number, start in enumerate(range(0, games, chunk)):
+        yield (difficulty, min(chunk, games - start), seed * 1000003 + number) + options
+
+def run(difficulty, games, workers, seed, chunk, options):
+    totals = {"X": 0, "O": 0, "tie": 0, "moves": 0, "nodes": 0, "search_time": 0.0}
+    start = time.perf_counter()
+    chunks = tasks(difficulty, games, seed, chunk, options)
+    if workers == 1:
+        results = list(map(play_games, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(play_games, chunks))
+    for result in results:
+        for key, value in result.items():
+            totals[key] += value
+    totals["elapsed"] = time.perf_counter() - start
+    return totals
+
+def report(difficulty, games, totals, workers):
+    elapsed = totals["elapsed"]
+    print("%-10s %9d games  X %6.2f%%  O %6.2f%%  draw %6.2f%%  %10.0f games/s  %12.0f nodes/s  %8.1f us/move" % (
+        difficulty, games,
+        100.0 * totals["X"] / games, 100.0 * totals["O"] / games, 100.0 * totals["tie"] / games,
+        games / elapsed if elapsed else 0.0,
+        # Nodes per second of search time on one core, times the cores in use
+        totals["nodes"] / totals["search_time"] * workers if totals["search_time"] else 0.0,
+        1e6 * totals["search_time"] / totals["moves"] if totals["moves"] else 0.0))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AI-vs-AI games in parallel and report results and speed.")
+    parser.add_argument("--games", type=int, default=10000, help="games per difficulty")
+    parser.add_argument("--difficulties", nargs="+", choices=DIFFICULTIES, default=list(DIFFICULTIES))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=None, help="games per task sent to a worker")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("--k", type=int, default=3, help="marks in a row to win")
+    parser.add_argument("--time-limit", type=float, default=1.0, help="seconds per move on boards too large to solve")
+    parser.add_argument("--cold", action="store_true", help="clear the transposition table before every game")
+    parser.add_argument("--table", action="store_true", help="answer impossible moves from the solved table")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    chunk = args.chunk or max(1, min(1000, args.games // (workers * 4)))
+    table_path = None
+    if args.table:
+        if not os.path.exists(DEFAULT_PATH):
+            parser.error("no solved table at %s; run solved_table.py first" % DEFAULT_PATH)
+        table_path = DEFAULT_PATH
+    options = (args.rows, args.cols, args.k, args.time_limit, args.cold, table_path)
+
+    for difficulty in args.difficulties:
+        totals = run(difficulty, args.games, workers, args.seed, chunk, options)
+        report(difficulty, args.games, totals, workers)
+
+if __name__ == "__main__":
+    main()
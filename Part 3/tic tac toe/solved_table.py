@@ -0,0 +1,127 @@
+import os
+import sys
+
+from game import TicTacToe, geometry, squares
+
+# Perfect-play table for small boards. Every position reachable from the empty
+# board is solved once and written to a binary file; "impossible" moves are
+# then a single table lookup instead of a search.
+#
+#   python solved_table.py                  writes solved_3x3.bin
+#   python solved_table.py out.bin 3 4 3    a 3x4 board, 3 in a row
+#
+# File layout: MAGIC, then rows, cols and k as one byte each, then two bytes
+# per (position, side to move): the best move (NO_MOVE if the position is not
+# reachable or already over) and the minimax score as a signed byte. A
+# position's entry is at (ternary(x) + 2 * ternary(o)) * 2 + (1 if O to move),
+# where ternary() reads the board as a base-3 number.
+
+MAGIC = b"TTT1"
+HEADER_SIZE = len(MAGIC) + 3
+NO_MOVE = 255
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved_3x3.bin")
+
+class SolvedTable:
+    def __init__(self, rows, cols, k, data):
+        self.geometry = geometry(rows, cols, k)
+        if not self.geometry.exact:
+            raise ValueError("only boards small enough to solve exactly have a solved table")
+        if len(data) != 2 * 2 * 3 ** self.geometry.size:
+            raise ValueError("solved table does not match a %dx%d board" % (rows, cols))
+        self.data = data
+        # ternary[mask] is the base-3 value of the squares in mask, counting each as 1
+        self.ternary = [sum(3 ** i for i in squares(mask)) for mask in range(1 << self.geometry.size)]
+
+    def entry(self, x_mask, o_mask, player):
+        return ((self.ternary[x_mask] + 2 * self.ternary[o_mask]) * 2 + (player == "O")) * 2
+
+    # (best move, score) for the position, or None when it is not in the table
+    def lookup(self, x_mask, o_mask, player):
+        offset = self.entry(x_mask, o_mask, player)
+        move = self.data[offset]
+        if move == NO_MOVE:
+            return None
+        score = self.data[offset + 1]
+        return move, score - 256 if score > 127 else score
+
+    # The table answers for every game of its size from now on
+    def install(self):
+        self.geometry.solved_table = self
+
+# Solve every position reachable from the empty board with X to move. Moves are
+# whatever get_best_move() picks at "impossible", so play is exactly as before.
+def build_solved_table(rows=3, cols=3, k=3):
+    game = TicTacToe(rows, cols, k)
+    # Search every position rather than answer from a table already installed,
+    # and put that table back afterwards
+    installed, game.geometry.solved_table = game.geometry.solved_table, None
+    try:
+        return _solve_positions(game, rows, cols, k)
+    finally:
+        game.geometry.solved_table = installed
+
+def _solve_positions(game, rows, cols, k):
+    data = bytearray([NO_MOVE, 0]) * (2 * 3 ** game.geometry.size)
+    table = SolvedTable(rows, cols, k, data)
+    seen = set()
+
+    def visit(x_mask, o_mask, player):
+        if (x_mask, o_mask) in seen:
+            return
+        seen.add((x_mask, o_mask))
+        game.x_mask, game.o_mask, game.current_player = x_mask, o_mask, player
+        if game.check_winner()[0] is not None:
+            return
+
+        move = game.get_best_move()
+        bit = 1 << move
+        if player == "X":
+            game.x_mask |= bit
+            score = game.minimax(0, False)
+        else:
+            game.o_mask |= bit
+            score = game.minimax(0, True)
+        offset = table.entry(x_mask, o_mask, player)
+        data[offset] = move
+        data[offset + 1] = score & 0xFF
+
+        for square in squares(~(x_mask | o_mask) & game.geometry.full_mask):
+            if player == "X":
+                visit(x_mask | 1 << square, o_mask, "O")
+            else:
+                visit(x_mask, o_mask | 1 << square, "X")
+
+    visit(0, 0, "X")
+    table.data = bytes(data)
+    return table
+
+def save_solved_table(table, path=DEFAULT_PATH):
+    g = table.geometry
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes([g.rows, g.cols, g.k]) + table.data)
+
+def load_solved_table(path=DEFAULT_PATH):
+    with open(path, "rb") as f:
+        contents = f.read()
+    if contents[:len(MAGIC)] != MAGIC:
+        raise ValueError("%s is not a solved table" % path)
+    rows, cols, k = contents[len(MAGIC):HEADER_SIZE]
+    return SolvedTable(rows, cols, k, contents[HEADER_SIZE:])
+
+# Load the table at path and install it, building and saving it first if missing
+def ensure_solved_table(path=DEFAULT_PATH, rows=3, cols=3, k=3):
+    if os.path.exists(path):
+        table = load_solved_table(path)
+    else:
+        table = build_solved_table(rows, cols, k)
+        save_solved_table(table, path)
+    table.install()
+    return table
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    rows, cols, k = (int(value) for value in sys.argv[2:5]) if len(sys.argv) > 4 else (3, 3, 3)
+    table = build_solved_table(rows, cols, k)
+    save_solved_table(table, path)
+    positions = sum(1 for move in table.data[::2] if move != NO_MOVE)
+    print("Solved %d positions, wrote %d bytes to %s" % (positions, HEADER_SIZE + len(table.data), path))
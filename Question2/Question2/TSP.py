@@ -1,55 +1,708 @@
+import os
+import pickle
 import random
 import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import matplotlib.pyplot as plt
 
+# Above this many towns, coordinate-only instances compute distances on
+# demand instead of storing an n x n matrix (4000 towns = 128 MB in float64)
+MATRIX_LIMIT = 4000
+
+# Distances come from an n x n matrix (nested lists, a float32/float64
+# array or a np.memmap, used without copying when already contiguous) or
+# from an (n, 2) coordinate array as straight-line distances. Small
+# coordinate instances get a full matrix in one vectorised pass; large ones
+# keep only the coordinates. distance(a, b) is the scalar lookup used by the
+# annealer's inner loop and returns a plain Python float.
 class TSP:
-    def __init__(self, towns, distance_matrix):
-        self.towns = towns
-        self.distances = distance_matrix
+    def __init__(self, towns=None, distance_matrix=None, coordinates=None, dtype=np.float64):
+        if distance_matrix is None and coordinates is None:
+            raise ValueError("TSP needs a distance matrix or coordinates")
+
+        self.coordinates = None
+        if coordinates is not None:
+            self.coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+            if self.coordinates.ndim != 2 or self.coordinates.shape[1] != 2:
+                raise ValueError("coordinates must have shape (n, 2)")
+
+        if distance_matrix is not None:
+            self.distances = as_distance_matrix(distance_matrix, dtype)
+        elif len(self.coordinates) <= MATRIX_LIMIT:
+            self.distances = coordinate_distances(self.coordinates, dtype)
+        else:
+            self.distances = None
+
+        self.size = len(self.distances) if self.distances is not None else len(self.coordinates)
+        self.towns = towns if towns is not None else list(range(self.size))
+
+        if self.distances is not None:
+            self.distance = self.distances.item
+        else:
+            self._xs = self.coordinates[:, 0].tolist()
+            self._ys = self.coordinates[:, 1].tolist()
+            self.distance = self._coordinate_distance
+        self._neighbor_lists = {}
+
+    # k nearest towns of every town, nearest first, as lists of lists.
+    # Built from the coordinates when there are any (grid bucketing), else
+    # from the matrix rows, and cached so each worker process builds them once.
+    def neighbor_lists(self, k):
+        k = min(k, self.size - 1)
+        if k not in self._neighbor_lists:
+            if self.coordinates is not None:
+                neighbors = nearest_neighbors(self.coordinates, k)
+            else:
+                neighbors = matrix_neighbors(self.distances, k)
+            self._neighbor_lists[k] = neighbors.tolist()
+        return self._neighbor_lists[k]
 
+    def _coordinate_distance(self, a, b):
+        return math.hypot(self._xs[a] - self._xs[b], self._ys[a] - self._ys[b])
+
+    # Open path: no return to the start
     def total_distance(self, route):
-        return sum(self.distances[route[i]][route[i+1]] for i in range(len(route) - 1))
-        # Removed return to start (no circular route)
+        route = np.asarray(route)
+        if self.distances is not None:
+            return float(self.distances[route[:-1], route[1:]].sum(dtype=np.float64))
+        steps = np.diff(self.coordinates[route], axis=0)
+        return float(np.hypot(steps[:, 0], steps[:, 1]).sum())
+
+# Contiguous float matrix view of distance_matrix; float32/float64 arrays
+# (including memory maps) are used as they are
+def as_distance_matrix(distance_matrix, dtype=np.float64):
+    if isinstance(distance_matrix, np.ndarray) and distance_matrix.dtype in (np.float32, np.float64):
+        matrix = distance_matrix if distance_matrix.flags.c_contiguous else np.ascontiguousarray(distance_matrix)
+    else:
+        matrix = np.ascontiguousarray(distance_matrix, dtype=dtype)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError("distance matrix must be square")
+    return matrix
+
+# All pairwise straight-line distances, one row block at a time so the
+# temporary differences never exceed a few MB
+def coordinate_distances(coordinates, dtype=np.float64, block=256):
+    n = len(coordinates)
+    matrix = np.empty((n, n), dtype=dtype)
+    for start in range(0, n, block):
+        diff = coordinates[start:start + block, None, :] - coordinates[None, :, :]
+        matrix[start:start + block] = np.sqrt((diff ** 2).sum(axis=2))
+    return matrix
+
+# k nearest neighbours of every point via grid bucketing: points are
+# hashed into square cells (about two per cell) and each query scans rings
+# of cells outwards until the k-th nearest found is closer than any
+# unscanned cell can be. Returns an (n, k) int array, nearest first.
+def nearest_neighbors(coordinates, k):
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    n = len(coordinates)
+    k = min(k, n - 1)
+    neighbors = np.empty((n, max(k, 0)), dtype=np.int64)
+    if k <= 0:
+        return neighbors
+
+    low = coordinates.min(axis=0)
+    extent = coordinates.max(axis=0) - low
+    cell_size = max(extent.max(), 1e-12) / max(1, int(math.sqrt(n / 2)))
+    shape = (extent // cell_size).astype(np.int64) + 1
+    cells = np.minimum(((coordinates - low) // cell_size).astype(np.int64), shape - 1)
 
+    # Points sorted by cell key = column * rows + row, so one column's run
+    # of cells is one contiguous slice of `order`
+    keys = cells[:, 0] * shape[1] + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    bounds = np.searchsorted(keys[order], np.arange(shape[0] * shape[1] + 1))
+
+    for i in range(n):
+        column, row = cells[i]
+        radius = 0
+        while True:
+            low_row, high_row = max(0, row - radius), min(shape[1] - 1, row + radius)
+            slices = [order[bounds[c * shape[1] + low_row]:bounds[c * shape[1] + high_row + 1]]
+                      for c in range(max(0, column - radius), min(shape[0] - 1, column + radius) + 1)]
+            found = np.concatenate(slices)
+            found = found[found != i]
+            covers_all = radius >= max(shape)
+            if len(found) >= k:
+                distances = np.hypot(*(coordinates[found] - coordinates[i]).T)
+                nearest = np.argpartition(distances, k - 1)[:k]
+                if covers_all or distances[nearest].max() <= radius * cell_size:
+                    neighbors[i] = found[nearest[np.argsort(distances[nearest], kind="stable")]]
+                    break
+            radius += 1
+    return neighbors
+
+# k nearest neighbours read off a distance matrix, a block of rows at a time
+def matrix_neighbors(distances, k, block=256):
+    n = len(distances)
+    k = min(k, n - 1)
+    neighbors = np.empty((n, max(k, 0)), dtype=np.int64)
+    for start in range(0, n if k > 0 else 0, block):
+        rows = np.array(distances[start:start + block], dtype=np.float64)
+        rows[np.arange(len(rows)), np.arange(start, start + len(rows))] = np.inf
+        nearest = np.argpartition(rows, k - 1, axis=1)[:, :k]
+        ranked = np.argsort(np.take_along_axis(rows, nearest, axis=1), axis=1, kind="stable")
+        neighbors[start:start + block] = np.take_along_axis(nearest, ranked, axis=1)
+    return neighbors
+
+# Memory-map a distance matrix saved with np.save, for instances too large
+# to read into memory up front
+def load_distance_matrix(path, mmap=True):
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+# Iterations between clock checks when solving against a time budget
+TIME_CHECK_INTERVAL = 256
+
+# Neighbourhood moves. Each is proposed with its cost change, computed from
+# the few edges it touches, and only applied to the route once accepted.
+MOVES = ("swap", "two_opt", "or_opt")
+
+# Each solver draws from its own random.Random(seed), so independent chains
+# never share a stream. After solve(), trace holds (iteration, current cost,
+# best cost) every trace_interval iterations.
+#
+# With neighbors=k, moves are built from k-nearest-neighbour candidate lists
+# instead of uniformly random positions: pick a town x and one of its k
+# nearest towns y, then propose the 2-opt, swap or or-opt move that makes x
+# and y adjacent. On large instances almost every random pair is a long,
+# hopeless edge, so this is where most of the acceptance rate comes from.
 class SimulatedAnnealingSolver:
-    def __init__(self, tsp, initial_temp=15000, cooling_rate=0.998, max_iter=20000):
+    def __init__(self, tsp, initial_temp=15000, cooling_rate=0.998, max_iter=20000, moves=MOVES, seed=None,
+                 trace_interval=1000, neighbors=None):
         self.tsp = tsp
         self.temp = initial_temp
         self.cooling_rate = cooling_rate
         self.max_iter = max_iter
+        self.moves = moves
+        self.rng = random.Random(seed)
+        self.trace_interval = trace_interval
+        self.trace = []
+        self.candidates = tsp.neighbor_lists(neighbors) if neighbors else None
+        # Position of every town in the route, kept only for candidate moves
+        self.position = None
+        self._positioned = None
 
     def generate_initial_route(self):
-        route = list(range(1, len(self.tsp.towns)))  # exclude Windhoek
-        random.shuffle(route)
+        route = list(range(1, self.tsp.size))  # exclude Windhoek
+        self.rng.shuffle(route)
         return [0] + route  # start at Windhoek
 
-    def swap_two_towns(self, route):
-        a, b = random.sample(range(1, len(route)), 2)
-        new_route = route[:]
-        new_route[a], new_route[b] = new_route[b], new_route[a]
-        return new_route
+    # Cost change of swapping the towns at positions a < b. The route is an
+    # open path, so the last town has no outgoing edge.
+    def swap_delta(self, route, a, b):
+        d = self.tsp.distance
+        x, y = route[a], route[b]
+        before_a = route[a - 1]
+        after_b = route[b + 1] if b + 1 < len(route) else None
+
+        if b == a + 1:
+            delta = d(before_a, y) - d(before_a, x)
+        else:
+            after_a, before_b = route[a + 1], route[b - 1]
+            delta = (d(before_a, y) + d(y, after_a) + d(before_b, x)
+                     - d(before_a, x) - d(x, after_a) - d(before_b, y))
+        if after_b is not None:
+            delta += d(x, after_b) - d(y, after_b)
+        return delta
+
+    # Cost change of reversing route[i..j] (2-opt); distances are symmetric
+    # so the reversed segment's inner edges cost the same
+    def two_opt_delta(self, route, i, j):
+        d = self.tsp.distance
+        before, first, last = route[i - 1], route[i], route[j]
+        delta = d(before, last) - d(before, first)
+        if j + 1 < len(route):
+            after = route[j + 1]
+            delta += d(first, after) - d(last, after)
+        return delta
+
+    # Cost change of moving the segment route[i..i+k-1] to just after
+    # position p (or-opt). p must lie outside [i-1, i+k-1].
+    def or_opt_delta(self, route, i, k, p):
+        d = self.tsp.distance
+        n = len(route)
+        first, last = route[i], route[i + k - 1]
+        before = route[i - 1]
+        after = route[i + k] if i + k < n else None
+        target = route[p]
+        target_next = route[p + 1] if p + 1 < n else None
+
+        delta = d(target, first) - d(before, first)
+        if after is not None:
+            delta += d(before, after) - d(last, after)
+        if target_next is not None:
+            delta += d(last, target_next) - d(target, target_next)
+        return delta
+
+    # A move of the given kind that puts a random town next to one of its
+    # candidates, or None when that pair gives no valid move
+    def candidate_move(self, route, kind):
+        n = len(route)
+        i = self.rng.randrange(n)
+        j = self.position[self.rng.choice(self.candidates[route[i]])]
+
+        if kind == "two_opt":
+            a, b = (i + 1, j) if i < j else (j + 1, i)
+            if b > a:
+                return ("two_opt", a, b), self.two_opt_delta(route, a, b)
+        elif kind == "or_opt":
+            if i > 0 and j != i - 1 and j != i:
+                return ("or_opt", i, 1, j), self.or_opt_delta(route, i, 1, j)
+        else:
+            a, b = sorted((i + 1, j))
+            if 0 < a < b < n:
+                return ("swap", a, b), self.swap_delta(route, a, b)
+        return None
+
+    # Pick a random move; returns (move, delta) where move is a tuple that
+    # apply_move() understands
+    def propose_move(self, route):
+        n = len(route)
+        rng = self.rng
+        kind = rng.choice(self.moves)
+
+        if self.candidates is not None:
+            proposal = self.candidate_move(route, kind)
+            if proposal is not None:
+                return proposal
+
+        if kind == "or_opt":
+            k = rng.randint(1, min(3, n - 2))
+            i = rng.randint(1, n - k)
+            choices = n - (k + 1)
+            if choices > 0:
+                p = rng.randrange(choices)
+                if p >= i - 1:
+                    p += k + 1
+                return ("or_opt", i, k, p), self.or_opt_delta(route, i, k, p)
+            kind = "swap"
+
+        a, b = sorted(rng.sample(range(1, n), 2))
+        if kind == "two_opt":
+            return ("two_opt", a, b), self.two_opt_delta(route, a, b)
+        return ("swap", a, b), self.swap_delta(route, a, b)
+
+    # Apply an accepted move to the route in place
+    def apply_move(self, route, move):
+        kind = move[0]
+        if kind == "swap":
+            _, a, b = move
+            route[a], route[b] = route[b], route[a]
+            changed = (a, b)
+        elif kind == "two_opt":
+            _, i, j = move
+            route[i:j + 1] = route[j:i - 1:-1]
+            changed = range(i, j + 1)
+        else:
+            _, i, k, p = move
+            segment = route[i:i + k]
+            del route[i:i + k]
+            position = p + 1 if p < i else p - k + 1
+            route[position:position] = segment
+            changed = range(min(i, position), max(i + k, position + k))
+
+        if self.position is not None:
+            for index in changed:
+                self.position[route[index]] = index
+
+    # Metropolis steps from (route, cost), multiplying temp by cooling_rate
+    # after each one (1.0 keeps it fixed, as parallel tempering needs). The
+    # route is changed in place; returns (cost, best_route, best_cost, temp)
+    # where best_route is None if nothing beat the starting cost.
+    def anneal(self, route, cost, temp, iterations, cooling_rate=1.0):
+        best_route, best_cost = None, cost
+        rng = self.rng
+        if self.candidates is not None and self._positioned is not route:
+            self.position = [0] * len(route)
+            for index, town in enumerate(route):
+                self.position[town] = index
+            self._positioned = route
+
+        for _ in range(iterations):
+            move, delta = self.propose_move(route)
+
+            if delta < 0 or (temp > 0 and rng.random() < math.exp(-delta / temp)):
+                self.apply_move(route, move)
+                cost += delta
+                if cost < best_cost:
+                    best_route = route[:]
+                    best_cost = cost
+
+            temp *= cooling_rate
+        return cost, best_route, best_cost, temp
+
+    def _start_state(self):
+        route = self.generate_initial_route()
+        cost = self.tsp.total_distance(route)
+        return {"route": route, "cost": cost, "best_route": route[:], "best_cost": cost,
+                "iteration": 0, "elapsed": 0.0, "temp": self.temp, "trace": [(0, cost, cost)]}
+
+    def _save_checkpoint(self, path, state):
+        state = dict(state, rng=self.rng.getstate())
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(state, f)
+        os.replace(path + ".tmp", path)  # atomic, so a crash never leaves half a file
+
+    def _load_checkpoint(self, path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        self.rng.setstate(state.pop("rng"))
+        return state
+
+    # Anytime search: yields (iteration, elapsed seconds, best route, best
+    # cost) for the starting route and again every time the best improves.
+    #
+    # Without time_limit this is the usual schedule of max_iter iterations.
+    # With time_limit (seconds) it runs until the budget is spent and cools
+    # by elapsed time instead: the temperature falls geometrically from
+    # initial_temp to the temperature max_iter iterations would have reached,
+    # so a 200 ms and a 30 s budget both finish cold.
+    #
+    # With checkpoint (a file path) the state is pickled every
+    # checkpoint_interval seconds and at the end, and an existing checkpoint
+    # is resumed from, including time already spent.
+    def improvements(self, time_limit=None, checkpoint=None, checkpoint_interval=30.0):
+        if checkpoint is not None and os.path.exists(checkpoint):
+            state = self._load_checkpoint(checkpoint)
+        else:
+            state = self._start_state()
+        route, cost, temp = state["route"], state["cost"], state["temp"]
+        self.trace = state["trace"]
+        final_temp = self.temp * self.cooling_rate ** self.max_iter
+
+        started = time.perf_counter() - state["elapsed"]
+        last_saved = time.perf_counter()
+        yield state["iteration"], state["elapsed"], state["best_route"], state["best_cost"]
+
+        while len(route) >= 3:
+            elapsed = time.perf_counter() - started
+            if time_limit is not None:
+                if elapsed >= time_limit:
+                    break
+                temp = self.temp * (final_temp / self.temp) ** (elapsed / time_limit)
+                steps, cooling_rate = TIME_CHECK_INTERVAL, 1.0
+            else:
+                if state["iteration"] >= self.max_iter:
+                    break
+                steps, cooling_rate = min(self.trace_interval, self.max_iter - state["iteration"]), self.cooling_rate
+
+            cost, block_route, block_cost, temp = self.anneal(route, cost, temp, steps, cooling_rate)
+            state["iteration"] += steps
+            state["elapsed"] = time.perf_counter() - started
+            state.update(cost=cost, temp=temp)
+            self.trace.append((state["iteration"], cost, min(block_cost, state["best_cost"])))
+
+            if block_route is not None and block_cost < state["best_cost"]:
+                state["best_route"], state["best_cost"] = block_route, block_cost
+                yield state["iteration"], state["elapsed"], block_route, block_cost
+
+            if checkpoint is not None and time.perf_counter() - last_saved >= checkpoint_interval:
+                self._save_checkpoint(checkpoint, state)
+                last_saved = time.perf_counter()
+
+        if checkpoint is not None:
+            self._save_checkpoint(checkpoint, state)
+
+    # Returns the best route and its cost. callback(route, cost, elapsed) is
+    # called for every improvement; see improvements() for the other options.
+    def solve(self, time_limit=None, callback=None, checkpoint=None, checkpoint_interval=30.0):
+        for _, elapsed, route, cost in self.improvements(time_limit, checkpoint, checkpoint_interval):
+            best_route = route
+            if callback is not None:
+                callback(route, cost, elapsed)
+
+        # Recompute once to drop floating-point drift from summed deltas
+        return best_route, self.tsp.total_distance(best_route)
+
+# Largest instance solve_tsp() hands to Held-Karp; the table has
+# 2**(n-1) * (n-1) entries, so every extra town doubles time and memory
+EXACT_LIMIT = 15
+
+# Exact Held-Karp dynamic programme for the same open path (start at town
+# 0, no return). cost[mask, j] is the shortest path from town 0 through the
+# towns in mask, ending at j; bit b of mask stands for town b + 1. Masks are
+# filled one popcount layer at a time, each layer in a single NumPy pass.
+class HeldKarpSolver:
+    def __init__(self, tsp):
+        self.tsp = tsp
 
     def solve(self):
-        current_route = self.generate_initial_route()
-        current_cost = self.tsp.total_distance(current_route)
-        best_route = current_route[:]
-        best_cost = current_cost
+        n = self.tsp.size
+        if n <= 2:
+            route = list(range(n))
+            return route, self.tsp.total_distance(route) if n == 2 else 0.0
+
+        distances = np.asarray(self.tsp.distances, dtype=np.float64)
+        m = n - 1
+        full = 1 << m
+        between = distances[1:, 1:]
+        cost = np.full((full, m), np.inf)
+        parent = np.full((full, m), -1, dtype=np.int8)
+        bits = 1 << np.arange(m)
+        cost[bits, np.arange(m)] = distances[0, 1:]
+
+        masks = np.arange(full)
+        popcount = ((masks[:, None] & bits) != 0).sum(axis=1)
+        for size in range(1, m):
+            layer = masks[popcount == size]
+            # extended[l, i, j]: path for layer[l] ending at i, then on to j
+            extended = cost[layer][:, :, None] + between[None, :, :]
+            previous = extended.argmin(axis=1)
+            best = np.take_along_axis(extended, previous[:, None, :], axis=1)[:, 0, :]
+            for j in range(m):
+                open_masks = (layer & bits[j]) == 0
+                grown = layer[open_masks] | bits[j]
+                cost[grown, j] = best[open_masks, j]
+                parent[grown, j] = previous[open_masks, j]
+
+        mask, last = full - 1, int(cost[full - 1].argmin())
+        best_cost = float(cost[mask, last])
+        tail = []
+        while last != -1:
+            tail.append(last + 1)
+            mask, last = mask ^ int(bits[last]), int(parent[mask, last])
+        return [0] + tail[::-1], best_cost
+
+# Pick a solver by size: Held-Karp up to exact_limit towns, annealing
+# above. Forcing method="annealing" on an instance Held-Karp can still
+# handle also reports the optimality gap, (cost - optimum) / optimum.
+# Extra keyword arguments go to SimulatedAnnealingSolver.
+def solve_tsp(tsp, method="auto", exact_limit=EXACT_LIMIT, **options):
+    if method not in ("auto", "exact", "annealing"):
+        raise ValueError(f"unknown method {method!r}; expected 'auto', 'exact' or 'annealing'")
+    exact_possible = tsp.size <= exact_limit and tsp.distances is not None
+    if method == "auto":
+        method = "exact" if exact_possible else "annealing"
+
+    if method == "exact":
+        if not exact_possible:
+            raise ValueError(f"exact solving needs a distance matrix and at most {exact_limit} towns")
+        route, cost = HeldKarpSolver(tsp).solve()
+        return {"method": "exact", "route": route, "cost": cost, "optimal_cost": cost, "gap": 0.0}
+
+    route, cost = SimulatedAnnealingSolver(tsp, **options).solve()
+    result = {"method": "annealing", "route": route, "cost": cost, "optimal_cost": None, "gap": None}
+    if exact_possible:
+        _, optimal_cost = HeldKarpSolver(tsp).solve()
+        result["optimal_cost"] = optimal_cost
+        result["gap"] = (cost - optimal_cost) / optimal_cost if optimal_cost else 0.0
+    return result
+
+# --- Parallel annealing ---
+# The TSP is sent to each worker process once, through the pool initializer,
+# rather than with every task.
+_worker_tsp = None
+
+def _init_worker(tsp):
+    global _worker_tsp
+    _worker_tsp = tsp
+
+# Stand-in for the pool when workers=1: runs tasks in this process
+class _InlinePool:
+    def __init__(self, tsp):
+        _init_worker(tsp)
+
+    def map(self, function, tasks):
+        return map(function, tasks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+def _pool(tsp, workers):
+    if workers == 1:
+        return _InlinePool(tsp)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tsp,))
+
+# Independent integer seeds, one per chain, derived from a single seed
+def chain_seeds(seed, count):
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(count)]
 
-        for _ in range(self.max_iter):
-            new_route = self.swap_two_towns(current_route)
-            new_cost = self.tsp.total_distance(new_route)
-            delta = new_cost - current_cost
+def _run_chain(task):
+    seed, options = task
+    solver = SimulatedAnnealingSolver(_worker_tsp, seed=seed, **options)
+    route, cost = solver.solve()
+    return {"seed": seed, "route": route, "cost": cost, "trace": solver.trace}
 
-            if delta < 0 or random.random() < math.exp(-delta / self.temp):
-                current_route = new_route
-                current_cost = new_cost
-                if new_cost < best_cost:
-                    best_route = new_route
-                    best_cost = new_cost
+# Run `chains` independent annealing chains across a process pool (all
+# cores by default; workers=1 runs them here). Extra keyword arguments go to
+# SimulatedAnnealingSolver. Returns the best route and cost plus every
+# chain's seed, result and trace.
+def solve_multistart(tsp, chains=None, seed=None, workers=None, **options):
+    chains = chains or workers or os.cpu_count() or 1
+    tasks = [(chain_seed, options) for chain_seed in chain_seeds(seed, chains)]
+    with _pool(tsp, workers) as pool:
+        results = list(pool.map(_run_chain, tasks))
+    best = min(results, key=lambda chain: chain["cost"])
+    return {"route": best["route"], "cost": best["cost"], "chains": results}
 
-            self.temp *= self.cooling_rate
+# Replicas for parallel tempering that stay in one process for the whole run.
+# Each has its own solver (and so its own random stream and position index)
+# and its own route; between rounds only temperatures go in and costs come
+# out, and routes are fetched once at the end.
+class _ReplicaGroup:
+    def __init__(self, tsp, seeds, moves, neighbors):
+        self.replicas = {}
+        for replica, seed in seeds:
+            solver = SimulatedAnnealingSolver(tsp, seed=seed, moves=moves, neighbors=neighbors)
+            route = solver.generate_initial_route()
+            cost = tsp.total_distance(route)
+            self.replicas[replica] = [solver, route, cost, route[:], cost]
 
-        return best_route, best_cost
+    def costs(self):
+        return {replica: state[2] for replica, state in self.replicas.items()}
+
+    # iterations steps for every replica at its temperature; returns
+    # {replica: (cost, best cost so far)}
+    def run(self, temps, iterations):
+        results = {}
+        for replica, temp in temps.items():
+            state = self.replicas[replica]
+            solver, route, cost = state[0], state[1], state[2]
+            cost, best_route, best_cost, _ = solver.anneal(route, cost, temp, iterations)
+            state[2] = cost
+            if best_route is not None and best_cost < state[4]:
+                state[3], state[4] = best_route, best_cost
+            results[replica] = (cost, state[4])
+        return results
+
+    def routes(self):
+        return {replica: (state[1], state[2], state[3], state[4]) for replica, state in self.replicas.items()}
+
+# Worker process for parallel tempering: builds its replicas, reports their
+# starting costs, then answers ("run", temps, iterations) and ("routes",)
+# until told to stop
+def _replica_worker(connection, tsp, seeds, moves, neighbors):
+    group = _ReplicaGroup(tsp, seeds, moves, neighbors)
+    connection.send(group.costs())
+    while True:
+        message = connection.recv()
+        if message[0] == "run":
+            connection.send(group.run(message[1], message[2]))
+        elif message[0] == "routes":
+            connection.send(group.routes())
+        else:
+            break
+    connection.close()
+
+# Parent's handle on a group of replicas: in this process when workers=1,
+# otherwise in a worker process reached through a pipe
+class _ReplicaHandle:
+    def __init__(self, tsp, seeds, moves, neighbors, inline):
+        self.group = self.process = self.connection = None
+        if inline:
+            self.group = _ReplicaGroup(tsp, seeds, moves, neighbors)
+        else:
+            self.connection, child = multiprocessing.Pipe()
+            self.process = multiprocessing.Process(target=_replica_worker,
+                                                   args=(child, tsp, seeds, moves, neighbors), daemon=True)
+            self.process.start()
+            child.close()
+
+    def costs(self):
+        return self.group.costs() if self.group else self.connection.recv()
+
+    # Start a round; results() collects it, so all workers run at once
+    def start(self, temps, iterations):
+        if self.group:
+            self.pending = self.group.run(temps, iterations)
+        else:
+            self.connection.send(("run", temps, iterations))
+
+    def results(self):
+        return self.pending if self.group else self.connection.recv()
+
+    def routes(self):
+        if self.group:
+            return self.group.routes()
+        self.connection.send(("routes",))
+        return self.connection.recv()
+
+    def close(self):
+        if self.process is not None:
+            try:
+                self.connection.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self.connection.close()
+            self.process.join()
+
+# Temperatures spaced geometrically from t_min up to t_max
+def temperature_ladder(t_min, t_max, count):
+    if count == 1:
+        return [t_min]
+    ratio = (t_max / t_min) ** (1 / (count - 1))
+    return [t_min * ratio ** i for i in range(count)]
+
+# Parallel tempering (replica exchange): one replica per temperature, each
+# running exchange_interval fixed-temperature steps per round. Replicas live
+# in the worker processes for the whole run (all cores by default, workers=1
+# keeps them here); each round only sends temperatures out and costs back.
+# After every round neighbouring temperatures swap replicas with probability
+# min(1, exp((1/T_i - 1/T_j) * (E_i - E_j))), so good routes drift down to
+# the cold end while hot replicas keep exploring. The default ladder is
+# scaled to the mean edge of a random route. Traces are per temperature.
+def solve_parallel_tempering(tsp, replicas=8, t_min=None, t_max=None, rounds=40, exchange_interval=500,
+                             seed=None, workers=None, moves=MOVES, neighbors=None):
+    rng = random.Random(seed)
+    seeds = list(enumerate(chain_seeds(seed, replicas)))
+    workers = min(replicas, workers or os.cpu_count() or 1)
+    handles = [_ReplicaHandle(tsp, seeds[i::workers], moves, neighbors, workers == 1) for i in range(workers)]
+    try:
+        costs = {}
+        for handle in handles:
+            costs.update(handle.costs())
+
+        # Too few towns to move anything; the floor keeps the ladder defined
+        # when every town sits at the same point and the route costs 0
+        if tsp.size < 3:
+            rounds = 0
+        scale = max(costs[0] / max(1, tsp.size - 1), 1e-12)
+        t_min = t_min if t_min is not None else scale / 1000
+        t_max = t_max if t_max is not None else scale
+        temps = temperature_ladder(t_min, t_max, replicas)
+        # replica_at[i] is the replica currently at temperature i
+        replica_at = list(range(replicas))
+        owner = {replica: handles[replica % workers] for replica in range(replicas)}
+
+        best_cost = min(costs.values())
+        traces = [[] for _ in range(replicas)]
+        accepted = [0] * (replicas - 1)
+
+        for round_number in range(rounds):
+            for handle in handles:
+                handle.start({replica: temps[i] for i, replica in enumerate(replica_at) if owner[replica] is handle},
+                             exchange_interval)
+            for handle in handles:
+                for replica, (cost, replica_best) in handle.results().items():
+                    costs[replica] = cost
+                    best_cost = min(best_cost, replica_best)
+            for i, replica in enumerate(replica_at):
+                traces[i].append(((round_number + 1) * exchange_interval, costs[replica], best_cost))
+
+            # Alternate even and odd pairs so every neighbour pair gets a turn
+            for i in range(round_number % 2, replicas - 1, 2):
+                exponent = (1 / temps[i] - 1 / temps[i + 1]) * (costs[replica_at[i]] - costs[replica_at[i + 1]])
+                if exponent >= 0 or rng.random() < math.exp(exponent):
+                    replica_at[i], replica_at[i + 1] = replica_at[i + 1], replica_at[i]
+                    accepted[i] += 1
+
+        routes = {}
+        for handle in handles:
+            routes.update(handle.routes())
+    finally:
+        for handle in handles:
+            handle.close()
+
+    best_route = min((route[2] for route in routes.values()), key=tsp.total_distance)
+    chains = [{"temperature": temps[i], "route": routes[replica][0], "cost": routes[replica][1], "trace": traces[i]}
+              for i, replica in enumerate(replica_at)]
+    return {"route": best_route, "cost": tsp.total_distance(best_route), "chains": chains, "exchanges": accepted}
 
 # Approximate coordinates for plotting towns geographically
 coordinates = {
@@ -108,21 +761,27 @@ distance_matrix = [
     [712, 779, 855, 485, 288, 342, 981, 1210, 30, 0]
 ]
 
-# Create TSP and Solver
-tsp = TSP(towns, distance_matrix)
-solver = SimulatedAnnealingSolver(tsp)
-
-# Initial route
-initial_route = solver.generate_initial_route()
-initial_distance = tsp.total_distance(initial_route)
-print("Initial Route:")
-print(" -> ".join(towns[i] for i in initial_route))
-print(f"Initial Distance: {initial_distance:.2f} km")
-plot_route(towns, initial_route, "Initial Route (10 towns, No Return to Windhoek)")
-
-# Optimized route
-best_route, best_distance = solver.solve()
-print("\nOptimized Route:")
-print(" -> ".join(towns[i] for i in best_route))
-print(f"Optimized Distance: {best_distance:.2f} km")
-plot_route(towns, best_route, "Optimized Route (10 towns, No Return to Windhoek)")
+if __name__ == "__main__":
+    # Create TSP and Solver
+    tsp = TSP(towns, distance_matrix)
+    solver = SimulatedAnnealingSolver(tsp)
+
+    # Initial route
+    initial_route = solver.generate_initial_route()
+    initial_distance = tsp.total_distance(initial_route)
+    print("Initial Route:")
+    print(" -> ".join(towns[i] for i in initial_route))
+    print(f"Initial Distance: {initial_distance:.2f} km")
+    plot_route(towns, initial_route, "Initial Route (10 towns, No Return to Windhoek)")
+
+    # Optimized route
+    best_route, best_distance = solver.solve()
+    print("\nOptimized Route:")
+    print(" -> ".join(towns[i] for i in best_route))
+    print(f"Optimized Distance: {best_distance:.2f} km")
+
+    # Exact optimum for comparison; 10 towns is well within Held-Karp range
+    optimal_route, optimal_distance = HeldKarpSolver(tsp).solve()
+    print(f"Optimal Distance (Held-Karp): {optimal_distance:.2f} km")
+    print(f"Optimality Gap: {100 * (best_distance - optimal_distance) / optimal_distance:.2f}%")
+    plot_route(towns, best_route, "Optimized Route (10 towns, No Return to Windhoek)")
@@ -1,5 +1,5 @@
+import itertools
 import numpy as np
-import random
 import tkinter as tk
 
 # GridWorld parameters
@@ -31,51 +31,262 @@ def step(state, action):
     else:
         return state, -1
 
-def epsilon_greedy(Q, state):
-    if random.random() < EPSILON:
-        return random.choice(ACTIONS)
-    else:
-        max_q = max(Q[state].values())
-        return random.choice([a for a in ACTIONS if Q[state][a] == max_q])
+# Actions are numbered in ACTIONS order and state (i, j) is i * grid_size + j
+N_ACTIONS = len(ACTIONS)
+# Every order of the actions; scanning Q in a randomly chosen one and keeping
+# the first maximum breaks ties uniformly, like random.choice over the best
+ACTION_ORDERS = list(itertools.permutations(range(N_ACTIONS)))
+# Random numbers are drawn this many steps at a time
+RANDOM_BLOCK = 65536
+
+def state_id(state, grid_size=GRID_SIZE):
+    return state[0] * grid_size + state[1]
 
-def initialize_Q():
-    return { (i, j): {a: 0.0 for a in ACTIONS} for i in range(GRID_SIZE) for j in range(GRID_SIZE) }
+# Next state and reward for every (state, action) as two (n_states, N_ACTIONS)
+# arrays: the same dynamics as step(), built for the whole grid at once
+def transition_table(grid_size=GRID_SIZE):
+    for name, (row, col) in (("A", A), ("A_PRIME", A_PRIME), ("B", B), ("B_PRIME", B_PRIME)):
+        if not (0 <= row < grid_size and 0 <= col < grid_size):
+            raise ValueError(f"{name} = {(row, col)} is outside a {grid_size}x{grid_size} grid")
+    states = np.arange(grid_size * grid_size)
+    rows, cols = np.divmod(states, grid_size)
+    next_state = np.empty((states.size, N_ACTIONS), dtype=np.int64)
+    reward = np.empty((states.size, N_ACTIONS))
+    for a, action in enumerate(ACTIONS):
+        dr, dc = ACTION_DELTAS[action]
+        new_rows, new_cols = rows + dr, cols + dc
+        inside = (new_rows >= 0) & (new_rows < grid_size) & (new_cols >= 0) & (new_cols < grid_size)
+        next_state[:, a] = np.where(inside, new_rows * grid_size + new_cols, states)
+        reward[:, a] = np.where(inside, 0.0, -1.0)
+    for special, target, value in ((A, A_PRIME, A_REWARD), (B, B_PRIME, B_REWARD)):
+        next_state[state_id(special, grid_size)] = state_id(target, grid_size)
+        reward[state_id(special, grid_size)] = value
+    return next_state, reward
 
-def q_learning():
+def initialize_Q(n_states=GRID_SIZE * GRID_SIZE):
+    return np.zeros((n_states, N_ACTIONS))
+
+def print_parameters(gamma=GAMMA, epsilon=EPSILON, alpha=ALPHA, episodes=EPISODES, steps_per_episode=STEPS_PER_EPISODE):
     print("Initializing Gridworld...")
     print(f"Grid size: {GRID_SIZE}x{GRID_SIZE}")
     print(f"Special_states = {{'A': {A}, 'B': {B}}}")
     print(f"Next_to_states = {{'A\\'': {A_PRIME}, 'B\\'': {B_PRIME}}}")
     print(f"Special_rewards = {{'A': {A_REWARD}, 'B': {B_REWARD}}}")
     print("Starting Q-learning with parameters:")
-    print(f" γ = {GAMMA}")
-    print(f" ε = {EPSILON}")
-    print(f" α = {ALPHA}")
-    print(f" Episodes = {EPISODES}")
-    print(f"Steps = {EPISODES * STEPS_PER_EPISODE}")
-
-    Q = initialize_Q()
-
-    for _ in range(EPISODES):
-        state = (random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1))
-        for _ in range(STEPS_PER_EPISODE):
-            action = epsilon_greedy(Q, state)
-            next_state, reward = step(state, action)
-            max_next = max(Q[next_state].values())
-            Q[state][action] += ALPHA * (reward + GAMMA * max_next - Q[state][action])
-            state = next_state
+    print(f" γ = {gamma}")
+    print(f" ε = {epsilon}")
+    print(f" α = {alpha}")
+    print(f" Episodes = {episodes}")
+    print(f"Steps = {episodes * steps_per_episode}")
+
+# Early stopping: training ends once no update in a whole window of this many
+# steps changed Q by tol or more
+CONVERGENCE_WINDOW = 10000
+
+# Tabular Q-learning on a (n_states, N_ACTIONS) array. The tables are read
+# through flat memoryviews, which index as fast as Python lists without
+# copying the arrays, and random numbers come from rng in blocks, so the
+# inner loop creates no lists or arrays.
+#
+# Q continues training from an existing table (see load_Q()), for instance
+# after A_REWARD or B_REWARD have been changed; it is copied, not modified.
+# With tol set, training stops early once the largest |change in Q| over the
+# last window steps is below tol. If stats is a dict it receives the episodes
+# and steps run, whether training converged and the largest change in the last
+# complete window (in the steps so far if training ended before one finished).
+def q_learning(gamma=GAMMA, epsilon=EPSILON, alpha=ALPHA, episodes=EPISODES,
+               steps_per_episode=STEPS_PER_EPISODE, grid_size=GRID_SIZE, seed=None,
+               Q=None, tol=None, window=CONVERGENCE_WINDOW, stats=None):
+    rng = np.random.default_rng(seed)
+    next_state, reward = transition_table(grid_size)
+    n_states = next_state.shape[0]
+    if Q is None:
+        Q = initialize_Q(n_states)
+    else:
+        Q = np.array(Q, dtype=float)
+        if Q.shape != next_state.shape:
+            raise ValueError(f"Q has shape {Q.shape}, expected {next_state.shape} for a {grid_size}x{grid_size} grid")
+
+    q = memoryview(Q.reshape(-1))
+    next_states = memoryview(next_state.reshape(-1))
+    rewards = memoryview(reward.reshape(-1))
+    actions = range(N_ACTIONS)
+    orders = ACTION_ORDERS
+    # Windows are tracked with or without tol so stats can report the last one
+    threshold = -1.0 if tol is None else tol
+    steps_left = window
+    largest = 0.0
+    window_change = None
+    converged = False
+    episodes_run = 0
+    steps_run = 0
 
+    episodes_per_block = max(1, RANDOM_BLOCK // steps_per_episode)
+    for first in range(0, episodes, episodes_per_block):
+        count = min(episodes_per_block, episodes - first)
+        starts = rng.integers(n_states, size=count).tolist()
+        explore = (rng.random(count * steps_per_episode) < epsilon).tolist()
+        random_actions = rng.integers(N_ACTIONS, size=count * steps_per_episode).tolist()
+        order_ids = rng.integers(len(orders), size=count * steps_per_episode).tolist()
+
+        t = 0
+        for state in starts:
+            for _ in range(steps_per_episode):
+                base = state * N_ACTIONS
+                if explore[t]:
+                    action = random_actions[t]
+                else:
+                    best = float('-inf')
+                    for a in orders[order_ids[t]]:
+                        if q[base + a] > best:
+                            best = q[base + a]
+                            action = a
+                t += 1
+
+                index = base + action
+                state = next_states[index]
+                next_base = state * N_ACTIONS
+                max_next = q[next_base]
+                for a in actions:
+                    if q[next_base + a] > max_next:
+                        max_next = q[next_base + a]
+                change = alpha * (rewards[index] + gamma * max_next - q[index])
+                q[index] += change
+
+                if change > largest:
+                    largest = change
+                elif -change > largest:
+                    largest = -change
+                steps_left -= 1
+                if steps_left == 0:
+                    window_change = largest
+                    if largest < threshold:
+                        converged = True
+                        break
+                    steps_left = window
+                    largest = 0.0
+            episodes_run += 1
+            if converged:
+                break
+        steps_run = first * steps_per_episode + t
+        if converged:
+            break
+
+    if stats is not None:
+        stats.update(episodes=episodes_run, steps=steps_run, converged=converged,
+                     max_change=largest if window_change is None else window_change)
     return Q
 
-def extract_value_and_policy(Q):
-    V = np.zeros((GRID_SIZE, GRID_SIZE))
-    policy = np.full((GRID_SIZE, GRID_SIZE), '', dtype=object)
-    for i in range(GRID_SIZE):
-        for j in range(GRID_SIZE):
-            state = (i, j)
-            best_action = max(Q[state], key=Q[state].get)
-            V[i, j] = Q[state][best_action]
-            policy[i, j] = ARROWS[best_action]
+def save_Q(Q, path):
+    np.save(path, Q)
+
+def load_Q(path):
+    return np.load(path)
+
+# Every combination of the given settings as three equal-length arrays, ready
+# for q_learning_batch()
+def parameter_grid(gammas=(GAMMA,), alphas=(ALPHA,), epsilons=(EPSILON,)):
+    combos = np.array(list(itertools.product(gammas, alphas, epsilons)), dtype=float)
+    return combos[:, 0], combos[:, 1], combos[:, 2]
+
+# Q-learning for B agents at once, each with its own Q-table, state and
+# gamma/alpha/epsilon; scalar settings apply to every agent, and batch sets B
+# when all of them are scalars. The agents step in lockstep: exploration,
+# greedy choice, transition and TD update are each one NumPy operation over
+# the batch. Returns Q with shape (B, n_states, N_ACTIONS).
+def q_learning_batch(gamma=GAMMA, alpha=ALPHA, epsilon=EPSILON, episodes=EPISODES,
+                     steps_per_episode=STEPS_PER_EPISODE, grid_size=GRID_SIZE, seed=None, batch=None):
+    settings = np.broadcast_arrays(gamma, alpha, epsilon, np.zeros(batch or 1))
+    gamma, alpha, epsilon = (np.array(value, dtype=float) for value in settings[:3])
+    batch = gamma.size
+
+    rng = np.random.default_rng(seed)
+    next_state, reward = transition_table(grid_size)
+    n_states = next_state.shape[0]
+    next_state, reward = next_state.reshape(-1), reward.reshape(-1)
+    Q = np.zeros((batch, n_states, N_ACTIONS))
+    q = Q.reshape(-1)
+
+    agents = np.arange(batch)
+    # Start of each agent's table in the flat view of Q
+    offsets = agents * (n_states * N_ACTIONS)
+    for _ in range(episodes):
+        states = rng.integers(n_states, size=batch)
+        for _ in range(steps_per_episode):
+            current = Q[agents, states]
+            # Random values only on the maxima, so argmax picks one of them uniformly
+            ties = np.where(current == current.max(axis=1, keepdims=True), rng.random((batch, N_ACTIONS)), -1.0)
+            actions = np.where(rng.random(batch) < epsilon, rng.integers(N_ACTIONS, size=batch), ties.argmax(axis=1))
+
+            index = states * N_ACTIONS + actions
+            states = next_state[index]
+            max_next = Q[agents, states].max(axis=1)
+            flat = offsets + index
+            q[flat] += alpha * (reward[index] + gamma * max_next - q[flat])
+
+    return Q
+
+# Model-based solvers. step() is deterministic and fully known, so the optimal
+# Q can be computed directly from transition_table() instead of sampled:
+#     Q(s, a) = reward[s, a] + gamma * V(next_state[s, a]),  V(s) = max_a Q(s, a)
+# Both return (Q, iterations) with Q shaped like q_learning()'s, so
+# extract_value_and_policy() and comparisons against a learner work unchanged.
+# Values only converge when rewards are discounted, so gamma must be in [0, 1).
+
+def check_gamma(gamma):
+    if not 0 <= gamma < 1:
+        raise ValueError(f"gamma must be in [0, 1) for the values to converge, got {gamma}")
+
+def value_iteration(gamma=GAMMA, grid_size=GRID_SIZE, tol=1e-8, max_iterations=100000):
+    check_gamma(gamma)
+    next_state, reward = transition_table(grid_size)
+    V = np.zeros(next_state.shape[0])
+    for iteration in range(1, max_iterations + 1):
+        Q = reward + gamma * V[next_state]
+        new_V = Q.max(axis=1)
+        change = np.abs(new_V - V).max()
+        V = new_V
+        if change < tol:
+            break
+    return reward + gamma * V[next_state], iteration
+
+# Value of following a fixed policy, given each state's successor and reward
+# under it. Each round doubles the horizon: if V holds the discounted reward
+# of the next h steps and successor jumps h steps ahead, then
+#     V + gamma**h * V[successor]
+# covers 2h steps. Stops once the discounted tail is below tol, so the result
+# is exact to tol after a handful of O(n) rounds, with no dense O(n**3) solve.
+def evaluate_policy(successor, reward, gamma=GAMMA, tol=1e-8):
+    check_gamma(gamma)
+    V = reward.astype(float)
+    discount = gamma
+    tail = np.abs(reward).max() / (1 - gamma)
+    while discount * tail >= tol:
+        V = V + discount * V[successor]
+        successor = successor[successor]
+        discount *= discount
+    return V
+
+def policy_iteration(gamma=GAMMA, grid_size=GRID_SIZE, tol=1e-8, max_iterations=1000):
+    check_gamma(gamma)
+    next_state, reward = transition_table(grid_size)
+    states = np.arange(next_state.shape[0])
+    policy = np.zeros(states.size, dtype=np.int64)
+    for iteration in range(1, max_iterations + 1):
+        V = evaluate_policy(next_state[states, policy], reward[states, policy], gamma, tol)
+        Q = reward + gamma * V[next_state]
+        # Only switch actions that are better by more than tol, so ties cannot cycle
+        best = Q.argmax(axis=1)
+        improve = Q[states, best] > Q[states, policy] + tol
+        if not improve.any():
+            break
+        policy = np.where(improve, best, policy)
+    return Q, iteration
+
+def extract_value_and_policy(Q, grid_size=GRID_SIZE):
+    V = Q.max(axis=1).reshape(grid_size, grid_size)
+    arrows = np.array([ARROWS[a] for a in ACTIONS], dtype=object)
+    policy = arrows[Q.argmax(axis=1)].reshape(grid_size, grid_size)
     return V, policy
 
 def print_results(V, policy):
@@ -144,6 +355,7 @@ def display_gui(V, policy):
 
 
 if __name__ == "__main__":
+    print_parameters()
     Q = q_learning()
     V, policy = extract_value_and_policy(Q)
     print_results(V, policy)
@@ -0,0 +1,117 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from MDP import (ALPHA, EPISODES, EPSILON, GAMMA, GRID_SIZE, STEPS_PER_EPISODE,
+                 extract_value_and_policy, q_learning, value_iteration)
+
+# Hyperparameter sweep for the Q-learning agent: every combination of the given
+# settings, times every seed, is trained in a process pool and scored against
+# the exact values from value_iteration().
+#
+#   python sweep.py --alphas 0.1 0.2 0.5 --epsilons 0.05 0.1 0.3 --seeds 8
+#   python sweep.py --gammas 0.8 0.9 --episodes 5000 50000 --csv results.csv
+#
+# Each run gets its own numpy Generator, spawned from one SeedSequence, so
+# results do not depend on which worker runs what or in what order.
+
+SETTINGS = ("gamma", "epsilon", "alpha", "episodes")
+METRICS = ("max_error", "mean_error", "optimal_actions", "seconds")
+COLUMNS = SETTINGS + ("seed",) + METRICS
+
+# Exact Q per (gamma, grid_size); each worker solves a given gamma once
+_REFERENCES = {}
+
+def reference(gamma, grid_size):
+    key = (gamma, grid_size)
+    if key not in _REFERENCES:
+        _REFERENCES[key] = value_iteration(gamma=gamma, grid_size=grid_size)[0]
+    return _REFERENCES[key]
+
+# Runs in a worker: train one configuration and compare it with the exact answer
+def run_config(task):
+    gamma, epsilon, alpha, episodes, seed, seed_sequence, grid_size, steps_per_episode = task
+    start = time.perf_counter()
+    Q = q_learning(gamma=gamma, epsilon=epsilon, alpha=alpha, episodes=episodes,
+                   steps_per_episode=steps_per_episode, grid_size=grid_size, seed=seed_sequence)
+    seconds = time.perf_counter() - start
+
+    exact = reference(gamma, grid_size)
+    V = extract_value_and_policy(Q, grid_size)[0].reshape(-1)
+    V_exact = exact.max(axis=1)
+    error = np.abs(V - V_exact)
+    # States whose greedy action is optimal under the exact Q
+    chosen = exact[np.arange(exact.shape[0]), Q.argmax(axis=1)]
+    optimal = np.mean(chosen >= V_exact - 1e-6)
+    return {"gamma": gamma, "epsilon": epsilon, "alpha": alpha, "episodes": episodes, "seed": seed,
+            "max_error": float(error.max()), "mean_error": float(error.mean()),
+            "optimal_actions": float(optimal), "seconds": seconds}
+
+# One results row per (setting combination, seed), in input order
+def sweep(gammas=(GAMMA,), epsilons=(EPSILON,), alphas=(ALPHA,), episodes=(EPISODES,), seeds=1,
+          grid_size=GRID_SIZE, steps_per_episode=STEPS_PER_EPISODE, base_seed=0, workers=None):
+    configs = list(itertools.product(gammas, epsilons, alphas, episodes))
+    seed_sequences = np.random.SeedSequence(base_seed).spawn(len(configs) * seeds)
+    tasks = [config + (seed, seed_sequences[number * seeds + seed], grid_size, steps_per_episode)
+             for number, config in enumerate(configs) for seed in range(seeds)]
+
+    if workers == 1:
+        return [run_config(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        return list(executor.map(run_config, tasks))
+
+# Mean of every metric over the seeds of each setting combination
+def summarize(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[name] for name in SETTINGS), []).append(row)
+    summary = []
+    for settings, group in groups.items():
+        entry = dict(zip(SETTINGS, settings))
+        entry["runs"] = len(group)
+        for name in METRICS:
+            entry[name] = sum(row[name] for row in group) / len(group)
+        summary.append(entry)
+    return summary
+
+def print_table(rows, columns=COLUMNS):
+    print(" ".join(f"{name:>15}" for name in columns))
+    for row in rows:
+        print(" ".join(f"{row[name]:>15.4g}" if isinstance(row[name], float) else f"{row[name]:>15}"
+                       for name in columns))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep Q-learning hyperparameters in parallel.")
+    parser.add_argument("--gammas", type=float, nargs="+", default=[GAMMA])
+    parser.add_argument("--epsilons", type=float, nargs="+", default=[EPSILON])
+    parser.add_argument("--alphas", type=float, nargs="+", default=[ALPHA])
+    parser.add_argument("--episodes", type=int, nargs="+", default=[EPISODES])
+    parser.add_argument("--seeds", type=int, default=4, help="runs per setting combination")
+    parser.add_argument("--seed", type=int, default=0, help="root seed for all runs")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--steps-per-episode", type=int, default=STEPS_PER_EPISODE)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--csv", default=None, help="write every run to this CSV file (- for stdout)")
+    args = parser.parse_args(argv)
+
+    rows = sweep(args.gammas, args.epsilons, args.alphas, args.episodes, args.seeds,
+                 args.grid_size, args.steps_per_episode, args.seed, args.workers)
+    if args.csv:
+        output = sys.stdout if args.csv == "-" else open(args.csv, "w", newline="")
+        try:
+            writer = csv.DictWriter(output, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+    print_table(summarize(rows), SETTINGS + ("runs",) + METRICS)
+
+if __name__ == "__main__":
+    main()